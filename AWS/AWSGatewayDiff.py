@@ -1,7 +1,8 @@
 import boto3
-import json
+import ijson
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 from botocore.exceptions import ClientError
 
@@ -45,7 +46,8 @@ def get_api_export(api_id, name):
             exportType='oas30',
             parameters={'extensions': 'integrations'}
         )
-        return json.loads(response['body'].read())
+        # Only 'paths' is diffed, so stream just that subtree instead of parsing the whole OAS document
+        return {'paths': dict(ijson.kvitems(response['body'], 'paths', use_float=True))}
     except ClientError as e:
         print(f"❌ Error fetching {name}: {e}")
         return None
@@ -66,8 +68,12 @@ def main():
     print("   AWS API GATEWAY DIFFERENCE CHECKER (.env)")
     print("--------------------------------------------------")
 
-    dev_json = get_api_export(DEV_API_ID, "DEV Gateway")
-    local_json = get_api_export(LOCAL_API_ID, "LOCAL Gateway")
+    # Both exports are independent network round-trips, so fetch them side by side
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        dev_future = executor.submit(get_api_export, DEV_API_ID, "DEV Gateway")
+        local_future = executor.submit(get_api_export, LOCAL_API_ID, "LOCAL Gateway")
+        dev_json = dev_future.result()
+        local_json = local_future.result()
 
     if not dev_json or not local_json:
         return
@@ -80,42 +86,43 @@ def main():
     issues_found = 0
 
     # A. Check for Missing Paths (Whole Endpoints)
-    all_dev_paths = set(dev_paths.keys())
-    all_local_paths = set(local_paths.keys())
+    all_dev_paths = dev_paths.keys()
+    all_local_paths = local_paths.keys()
     
     missing_in_local = all_dev_paths - all_local_paths
     
     if missing_in_local:
         print(f"🔴 MISSING ENDPOINTS (Exists in Dev, missing in Local):")
-        for p in missing_in_local:
+        for p in sorted(missing_in_local):
             print(f"   ❌ {p}")
             issues_found += 1
         print("-" * 40)
 
     # B. Check for Missing Methods & Integration Mismatches
     print(f"🟠 CONFIGURATION DIFFERENCES (Checking overlapping paths):")
-    for path in all_dev_paths.intersection(all_local_paths):
+    for path in sorted(all_dev_paths & all_local_paths):
         dev_methods = dev_paths[path]
         local_methods = local_paths[path]
+        dev_mset = dev_methods.keys()
+        local_mset = local_methods.keys()
 
-        for method, dev_details in dev_methods.items():
-            # 1. Method Missing? (e.g. GET exists, but POST missing)
-            if method not in local_methods:
-                print(f"   ❌ [MISSING METHOD] {path} -> {method.upper()} missing in Local")
+        # 1. Method Missing? (e.g. GET exists, but POST missing)
+        for method in sorted(dev_mset - local_mset):
+            print(f"   ❌ [MISSING METHOD] {path} -> {method.upper()} missing in Local")
+            issues_found += 1
+
+        # 2. Integration Mismatch? (e.g. Points to wrong Lambda)
+        for method in sorted(dev_mset & local_mset):
+            dev_integ = normalize_integration(dev_methods[method])
+            local_integ = normalize_integration(local_methods[method])
+
+            # We ignore 'uri' differences if they are identical except for the function name
+            # But strict comparison is usually better for 'Ditto Copy' requirements.
+            if dev_integ != local_integ:
+                print(f"   ⚠️  [MISMATCH] {path} [{method.upper()}]")
+                print(f"       Dev URI:   {dev_integ.get('uri')}")
+                print(f"       Local URI: {local_integ.get('uri')}")
                 issues_found += 1
-            else:
-                # 2. Integration Mismatch? (e.g. Points to wrong Lambda)
-                local_details = local_methods[method]
-                dev_integ = normalize_integration(dev_details)
-                local_integ = normalize_integration(local_details)
-
-                # We ignore 'uri' differences if they are identical except for the function name
-                # But strict comparison is usually better for 'Ditto Copy' requirements.
-                if dev_integ != local_integ:
-                    print(f"   ⚠️  [MISMATCH] {path} [{method.upper()}]")
-                    print(f"       Dev URI:   {dev_integ.get('uri')}")
-                    print(f"       Local URI: {local_integ.get('uri')}")
-                    issues_found += 1
 
     print("\n" + "="*50)
     if issues_found == 0:
@@ -1,11 +1,16 @@
 import streamlit as st
-import json
+import orjson
 import os
 import pandas as pd
+import numpy as np
 import re
+import io
+import sys
+import asyncio
+import aiofiles
 import glob
-import difflib
 import datetime
+from rapidfuzz import process, fuzz
 
 # ==========================================
 # 1. PAGE CONFIG & CUSTOM CSS
@@ -38,31 +43,79 @@ st.markdown("""
 # ==========================================
 # 2. INTELLIGENT DATA LOADER (LOCKED)
 # ==========================================
-@st.cache_data
-def load_data_recursively(folder_path):
+def _fingerprint(folder_path):
+    """Sorted (path, root, file, size, mtime_ns) for every dump JSON, gathered with os.scandir (no per-file re-stat)"""
+    entries = []
+    pending = [folder_path]
+    while pending:
+        root = pending.pop()
+        try: it = os.scandir(root)
+        except OSError: continue
+        with it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False): pending.append(entry.path)  # os.walk didn't follow dir symlinks either
+                elif entry.name.endswith(".json") and not entry.name.startswith("metadata"):
+                    stat = entry.stat()
+                    entries.append((entry.path, root, entry.name, stat.st_size, stat.st_mtime_ns))
+    return tuple(sorted(entries))
+
+@st.cache_resource(show_spinner=False)
+def _parsed_files():
+    """Process-wide {path: (size, mtime_ns, parsed JSON)}; a stale stamp means the file is re-read"""
+    return {}
+
+async def _read_one(sem, full_path):
+    async with sem:
+        try:
+            async with aiofiles.open(full_path, 'rb') as f:
+                return orjson.loads(await f.read())
+        except: return None
+
+async def _read_all(paths):
+    # Bounded so huge dumps don't exhaust file descriptors on network mounts
+    sem = asyncio.Semaphore(64)
+    return await asyncio.gather(*[_read_one(sem, p) for p in paths])
+
+def _route(root, file, content):
+    """Returns (bucket, name) for a parsed dump file, or None if it isn't routed anywhere"""
+    try:
+        name = file.replace('.json', '')
+        parent = os.path.basename(root)
+
+        if "task_definitions" in root or "task_definitions" in parent:
+            if 'containerDefinitions' in content or 'taskDefinition' in content:
+                return "ecs_td", name
+        elif "s3_buckets" in root:
+            return "s3", name
+        elif "api_gateway" in root:
+            return "api_gw", name
+    except: pass
+    return None
+
+@st.cache_data(show_spinner=False)
+def _load_dump(fingerprint):
     data = {"ecs_td": {}, "s3": {}, "api_gw": {}, "sqs": {}, "lambda": {}}
-    if not folder_path or not os.path.exists(folder_path): return data
-
-    for root, dirs, files in os.walk(folder_path):
-        for file in files:
-            if file.endswith(".json") and not file.startswith("metadata"):
-                full_path = os.path.join(root, file)
-                try:
-                    with open(full_path, 'r') as f:
-                        content = json.load(f)
-                    name = file.replace('.json', '')
-                    parent = os.path.basename(root)
-
-                    if "task_definitions" in root or "task_definitions" in parent:
-                        if 'containerDefinitions' in content or 'taskDefinition' in content:
-                            data["ecs_td"][name] = content
-                    elif "s3_buckets" in root:
-                        data["s3"][name] = content
-                    elif "api_gateway" in root:
-                        data["api_gw"][name] = content
-                except: pass 
+    if not fingerprint: return data
+
+    parsed = _parsed_files()
+    misses = [e for e in fingerprint if parsed.get(e[0], (None, None))[:2] != (e[3], e[4])]
+    if misses:
+        # Overlap all the open/read stalls of the changed files in one event loop
+        for (full_path, _, _, size, mtime_ns), content in zip(misses, asyncio.run(_read_all([e[0] for e in misses]))):
+            parsed[full_path] = (size, mtime_ns, content)
+
+    for full_path, root, file, _, _ in fingerprint:
+        content = parsed[full_path][2]
+        if content is None: continue
+        routed = _route(root, file, content)
+        if routed: data[routed[0]][routed[1]] = content
     return data
 
+def load_data_recursively(folder_path):
+    if not folder_path or not os.path.exists(folder_path): return _load_dump(())
+    # Keyed on the folder's (path, size, mtime) fingerprint, so on-disk edits are picked up without "Load Dumps"
+    return _load_dump(_fingerprint(folder_path))
+
 def find_best_match(source_name, target_keys):
     if not target_keys or not source_name: return None
     replacements = [('dev', 'stg'), ('dev', 'prod'), ('us', 'eu'), ('west', 'central'), ('v1', 'v2')]
@@ -70,18 +123,17 @@ def find_best_match(source_name, target_keys):
     for old, new in replacements: prediction = prediction.replace(old, new)
     for key in target_keys:
         if prediction in key.lower(): return key
-    matches = difflib.get_close_matches(source_name, target_keys, n=1, cutoff=0.5)
-    return matches[0] if matches else None
+    # fuzz.ratio is difflib's ratio on a 0-100 scale, so this keeps the old cutoff=0.5 behaviour
+    match = process.extractOne(source_name, target_keys, scorer=fuzz.ratio, score_cutoff=50)
+    return match[0] if match else None
 
 # ==========================================
 # 3. ECS & S3 LOGIC (LOCKED)
 # ==========================================
 def parse_ecs_env(container_def):
-    vars_map = {}
-    for item in container_def.get('environment', []):
-        vars_map[item['name']] = {'value': item['value'], 'type': 'Plain'}
-    for item in container_def.get('secrets', []):
-        vars_map[item['name']] = {'value': item['valueFrom'], 'type': 'Secret'}
+    """{name: (value, type)}; plain 2-tuples instead of a small dict per variable. Secrets win on name clashes."""
+    vars_map = {item['name']: (item['value'], 'Plain') for item in container_def.get('environment', [])}
+    vars_map.update({item['name']: (item['valueFrom'], 'Secret') for item in container_def.get('secrets', [])})
     return vars_map
 
 def get_container_def(json_data):
@@ -89,16 +141,38 @@ def get_container_def(json_data):
     elif 'taskDefinition' in json_data: return json_data['taskDefinition']['containerDefinitions'][0]
     else: raise ValueError("Invalid Task Definition Format")
 
-def normalize_policy_logic(policy_json):
-    if not policy_json: return []
-    s_str = json.dumps(policy_json, sort_keys=True)
-    s_str = re.sub(r'\d{12}', '{{ACCOUNT_ID}}', s_str)
-    s_str = re.sub(r'arn:aws:[a-z0-9-:]+:[a-z0-9-_\./]+', '{{ARN_MASKED}}', s_str)
-    clean_pol = json.loads(s_str)
+_ACCT_RE = re.compile(r'\d{12}')
+_ARN_RE = re.compile(r'arn:aws:[a-z0-9-:]+:[a-z0-9-_\./]+')
+_acct_sub, _arn_sub = _ACCT_RE.sub, _ARN_RE.sub
+
+def _mask_str(s):
+    # Strings that can't match are returned as-is without entering the regex engine
+    if len(s) >= 12: s = _acct_sub('{{ACCOUNT_ID}}', s)
+    if 'arn:aws:' in s: s = _arn_sub('{{ARN_MASKED}}', s)
+    return s
+
+def _mask(obj):
+    """Copy of obj with account IDs/ARNs masked in every string (keys included), non-strings untouched"""
+    if isinstance(obj, str): return _mask_str(obj)
+    if isinstance(obj, dict): return {_mask(k): _mask(v) for k, v in obj.items()}
+    if isinstance(obj, list): return [_mask(v) for v in obj]
+    return obj
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def _normalize_policy_cached(policy_key):
+    clean_pol = _mask(orjson.loads(policy_key))
     stmts = clean_pol.get('Statement', [])
     if isinstance(stmts, dict): stmts = [stmts]
     return stmts
 
+def normalize_policy_logic(policy_json):
+    if not policy_json: return []
+    # Sorted-key serialisation is only the cache key; masking walks the dict directly
+    return _normalize_policy_cached(orjson.dumps(policy_json, option=orjson.OPT_SORT_KEYS))
+
+# Env var names that normally differ per environment (endpoints, ARNs, ...); same substring test as the old any(...) list
+_CONFIG_SUFFIX_RE = re.compile(r'_(?:HOST|URL|URI|ARN|DB|BUCKET)')
+
 def render_ecs_dashboard(d_json, s_json, region_context):
     try:
         report_data = {"Critical": [], "Suspicious": [], "Info": []}
@@ -121,23 +195,25 @@ def render_ecs_dashboard(d_json, s_json, region_context):
 
         map_d = parse_ecs_env(c_dev)
         map_s = parse_ecs_env(c_stg)
-        all_keys = sorted(set(map_d.keys()) | set(map_s.keys()))
-        rows = []
-        for k in all_keys:
-            val_d = map_d.get(k, {}).get('value', '-')
-            val_s = map_s.get(k, {}).get('value', '-')
-            status = "✅ Match"; category = "Expected"
-            if val_d == '-': status = "❌ Missing in Source"; category = "Critical"
-            elif val_s == '-': status = "❌ Missing in Target"; category = "Critical"
-            elif region_context == "EU (Ireland)" and ("us-east-1" in str(val_s) or "us-west-2" in str(val_s)): status = "🌍 Region Violation"; category = "Critical"
-            elif "SECRET" in k and map_d.get(k, {}).get('type') != map_s.get(k, {}).get('type'): status = "🔓 Type Risk"; category = "Critical"
-            elif val_d != val_s:
-                if any(x in k for x in ['_HOST', '_URL', '_URI', '_ARN', '_DB', '_BUCKET']): status = "🔄 Config Diff"; category = "Expected"
-                else: status = "⚠️ Value Drift"; category = "Suspicious"
-            if category != "Match":
-                rows.append({"Variable": k, "Status": status, "Source Value": val_d, "Target Value": val_s, "Category": category})
-                if category != "Expected": report_data[category].append(f"{k}: {status} ({val_d} -> {val_s})")
-        df = pd.DataFrame(rows)
+        # Outer-merge both sides on Variable and classify with np.select (first matching rule wins, like the old elif chain)
+        df_d = pd.DataFrame([(k, *v) for k, v in map_d.items()], columns=['Variable', 'Source Value', 'type_d'])
+        df_s = pd.DataFrame([(k, *v) for k, v in map_s.items()], columns=['Variable', 'Target Value', 'type_s'])
+        df = df_d.merge(df_s, on='Variable', how='outer').fillna('-').sort_values('Variable', ignore_index=True)
+        var, val_d, val_s = df['Variable'], df['Source Value'], df['Target Value']
+        drift = val_d != val_s
+        conds = [
+            val_d == '-',
+            val_s == '-',
+            (region_context == "EU (Ireland)") & val_s.astype(str).str.contains('us-east-1|us-west-2'),
+            var.str.contains('SECRET', regex=False) & (df['type_d'] != df['type_s']),
+            drift & var.str.contains(_CONFIG_SUFFIX_RE),
+            drift,
+        ]
+        df['Status'] = np.select(conds, ["❌ Missing in Source", "❌ Missing in Target", "🌍 Region Violation", "🔓 Type Risk", "🔄 Config Diff", "⚠️ Value Drift"], default="✅ Match")
+        df['Category'] = np.select(conds, ["Critical", "Critical", "Critical", "Critical", "Expected", "Suspicious"], default="Expected")
+        df = df[['Variable', 'Status', 'Source Value', 'Target Value', 'Category']]
+        for k, status, v_d, v_s, category in df[df['Category'] != "Expected"].itertuples(index=False, name=None):
+            report_data[category].append(f"{k}: {status} ({v_d} -> {v_s})")
         if not df.empty:
             crit = df[df['Category'] == "Critical"]
             susp = df[df['Category'] == "Suspicious"]
@@ -165,7 +241,9 @@ def render_s3_dashboard(d_json, s_json):
 
     p_dev = normalize_policy_logic(d_json.get('Policy'))
     p_stg = normalize_policy_logic(s_json.get('Policy'))
-    missing = [p for p in p_dev if p not in p_stg]
+    # Canonical bytes make statements hashable, so this is one set probe per statement instead of a list scan
+    stg_set = {orjson.dumps(p, option=orjson.OPT_SORT_KEYS) for p in p_stg}
+    missing = [p for p in p_dev if orjson.dumps(p, option=orjson.OPT_SORT_KEYS) not in stg_set]
     
     if not missing:
         st.success("✅ Policies Match Semantically")
@@ -181,53 +259,54 @@ def render_s3_dashboard(d_json, s_json):
 # ==========================================
 
 # --- EXACT COPIES OF YOUR REFERENCE SCRIPT FUNCTIONS ---
+_INTEGRATION_KEYS = tuple(sys.intern(k) for k in ('type', 'uri', 'httpMethod', 'timeoutInMillis', 'requestParameters'))
+_IGNORED_KEYS = frozenset(sys.intern(k) for k in ('uri', 'credentials', 'passthroughBehavior'))
+
 def compare_dicts(d1, d2, path=""):
-    """Recursively compares two dictionaries and returns a list of difference strings."""
-    differences = []
-    
-    # Keys in d1 but not d2
-    for key in d1:
-        if key not in d2:
-            differences.append(f"MISSING KEY at {path}->{key}: Present in Dev, Missing in Local")
-    
-    # Keys in d2 but not d1
-    for key in d2:
-        if key not in d1:
-            differences.append(f"EXTRA KEY at {path}->{key}: Missing in Dev, Present in Local")
-
-    # Compare values for common keys
-    for key in d1:
-        if key in d2:
-            val1 = d1[key]
-            val2 = d2[key]
-            current_path = f"{path}->{key}"
-
-            # IGNORE LOGIC (From reference script)
-            if key in ['uri', 'credentials', 'passthroughBehavior']: 
-                pass 
-            elif isinstance(val1, dict) and isinstance(val2, dict):
-                differences.extend(compare_dicts(val1, val2, current_path))
+    """Compares two dictionaries depth-first (explicit stack, no recursion) and yields difference strings lazily."""
+    stack = [(d1, d2, path)]
+
+    while stack:
+        a, b, p = stack.pop()
+        a_keys, b_keys = a.keys(), b.keys()
+
+        # Keys in d1 but not d2 / in d2 but not d1 (C-level set ops, sorted for a stable report)
+        for key in sorted(a_keys - b_keys):
+            yield f"MISSING KEY at {p}->{key}: Present in Dev, Missing in Local"
+        for key in sorted(b_keys - a_keys):
+            yield f"EXTRA KEY at {p}->{key}: Missing in Dev, Present in Local"
+
+        # Compare values for common keys; nested dicts are queued so they pop in key order
+        nested = []
+        for key in a:
+            if key not in b or key in _IGNORED_KEYS: continue  # IGNORE LOGIC (From reference script)
+            val1 = a[key]
+            val2 = b[key]
+            current_path = f"{p}->{key}"
+
+            if isinstance(val1, dict) and isinstance(val2, dict):
+                nested.append((val1, val2, current_path))
             elif isinstance(val1, list) and isinstance(val2, list):
                 if val1 != val2:
-                     differences.append(f"LIST MISMATCH at {current_path}\n      Dev:   {val1}\n      Local: {val2}")
+                     yield f"LIST MISMATCH at {current_path}\n      Dev:   {val1}\n      Local: {val2}"
             else:
                 if val1 != val2:
-                    differences.append(f"VALUE MISMATCH at {current_path}\n      Dev:   {val1}\n      Local: {val2}")
-    return differences
+                    yield f"VALUE MISMATCH at {current_path}\n      Dev:   {val1}\n      Local: {val2}"
+        stack.extend(reversed(nested))
 
 def normalize_integration(method_data):
     """Extracts integration details often responsible for 'typos'"""
     if 'x-amazon-apigateway-integration' in method_data:
         integ = method_data['x-amazon-apigateway-integration']
-        return {
-            'type': integ.get('type'),
-            'uri': integ.get('uri'),
-            'httpMethod': integ.get('httpMethod'),
-            'timeoutInMillis': integ.get('timeoutInMillis'),
-            'requestParameters': integ.get('requestParameters')
-        }
+        return {k: integ.get(k) for k in _INTEGRATION_KEYS}
     return {}
 
+def _build_normalized_paths(api_json):
+    """{path: {method: normalized integration}} for one export, built once per render.
+    Not st.cache_data: hashing + unpickling a whole export costs far more than this walk"""
+    return {path: {method: normalize_integration(details) for method, details in methods.items()}
+            for path, methods in api_json.get('paths', {}).items()}
+
 def render_api_dashboard_strict(dev_json, local_json):
     """
     Implements the EXACT logic from the reference script.
@@ -235,25 +314,25 @@ def render_api_dashboard_strict(dev_json, local_json):
     """
     timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     
-    # Initialize Report String
-    report_lines = []
-    report_lines.append("========================================================")
-    report_lines.append(f" AWS API GATEWAY AUDIT REPORT")
-    report_lines.append(f" Generated: {timestamp}")
-    report_lines.append("========================================================\n")
+    # Initialize Report String (written straight into one buffer, no per-line list + join)
+    buf = io.StringIO()
+    buf.write("========================================================\n")
+    buf.write(f" AWS API GATEWAY AUDIT REPORT\n")
+    buf.write(f" Generated: {timestamp}\n")
+    buf.write("========================================================\n\n")
 
     issues_found = 0
     ui_rows = []
 
-    dev_paths = dev_json.get('paths', {})
-    local_paths = local_json.get('paths', {})
+    dev_paths = _build_normalized_paths(dev_json)
+    local_paths = _build_normalized_paths(local_json)
     all_paths = sorted(dev_paths.keys())
 
     for path in all_paths:
         # 1. Missing Path Check
         if path not in local_paths:
-            report_lines.append(f"🔴 [MISSING PATH] {path}")
-            report_lines.append(f"   Action: This entire endpoint is missing in Local.\n")
+            buf.write(f"🔴 [MISSING PATH] {path}\n")
+            buf.write(f"   Action: This entire endpoint is missing in Local.\n\n")
             ui_rows.append({"Path": path, "Issue": "🔴 Entire Path Missing", "Detail": "Missing in Target"})
             issues_found += 1
             continue
@@ -262,38 +341,36 @@ def render_api_dashboard_strict(dev_json, local_json):
         dev_methods = dev_paths[path]
         local_methods = local_paths[path]
 
-        for method, dev_details in dev_methods.items():
+        for method, dev_integ in dev_methods.items():
             if method not in local_methods:
-                report_lines.append(f"🟠 [MISSING METHOD] {path} [{method.upper()}]")
-                report_lines.append(f"   Action: The path exists, but {method.upper()} is missing.\n")
+                buf.write(f"🟠 [MISSING METHOD] {path} [{method.upper()}]\n")
+                buf.write(f"   Action: The path exists, but {method.upper()} is missing.\n\n")
                 ui_rows.append({"Path": path, "Issue": f"🟠 Method {method.upper()} Missing", "Detail": "Method missing in Target"})
                 issues_found += 1
                 continue
 
             # 3. Deep Recursive Compare (The "Reference" Logic)
-            local_details = local_methods[method]
-            dev_integ = normalize_integration(dev_details)
-            local_integ = normalize_integration(local_details)
-
-            diffs = compare_dicts(dev_integ, local_integ, path="Integration")
-
-            if diffs:
-                report_lines.append(f"⚠️  [MISMATCH] {path} [{method.upper()}]")
-                for d in diffs:
-                    report_lines.append(f"   - {d}")
-                report_lines.append("")
+            local_integ = local_methods[method]
+            diff_iter = compare_dicts(dev_integ, local_integ, path="Integration")
+            first = next(diff_iter, None)
+
+            if first is not None:
+                buf.write(f"⚠️  [MISMATCH] {path} [{method.upper()}]\n")
+                buf.write(f"   - {first}\n")
+                buf.writelines(f"   - {d}\n" for d in diff_iter)
+                buf.write("\n")
                 
                 # Add to UI (First diff only to keep UI clean)
-                first_diff_clean = diffs[0].split('\n')[0] # Keep it one line
+                first_diff_clean = first.split('\n')[0] # Keep it one line
                 ui_rows.append({"Path": path, "Issue": f"⚠️ {method.upper()} Mismatch", "Detail": first_diff_clean})
                 issues_found += 1
 
     if issues_found == 0:
-        report_lines.append("\n✅ RESULT: Perfect Match! No configuration differences found.")
+        buf.write("\n✅ RESULT: Perfect Match! No configuration differences found.")
     else:
-        report_lines.append(f"\n❌ RESULT: Found {issues_found} issues that need attention.")
+        buf.write(f"\n❌ RESULT: Found {issues_found} issues that need attention.")
 
-    return ui_rows, "\n".join(report_lines)
+    return ui_rows, buf.getvalue()
 
 # ==========================================
 # 5. MAIN APP LAYOUT
@@ -372,15 +449,14 @@ with tab3:
         if ui_rows:
             st.error(f"❌ Found {len(ui_rows)} Differences")
             
-            # CSS hack for black text on styled rows
-            def color_api_rows(row):
-                if "🔴" in row['Issue']: return ['background-color: #ffebee; color: black'] * len(row)
-                if "🟠" in row['Issue']: return ['background-color: #fff3e0; color: black'] * len(row)
-                if "⚠️" in row['Issue']: return ['background-color: #fff8e1; color: black'] * len(row)
-                return ['color: black'] * len(row)
-
+            # CSS hack for black text on styled rows; colors picked once per column instead of per row
             df = pd.DataFrame(ui_rows)
-            st.dataframe(df.style.apply(color_api_rows, axis=1), use_container_width=True, hide_index=True)
+            issue = df['Issue']
+            row_css = np.select(
+                [issue.str.contains('🔴', regex=False), issue.str.contains('🟠', regex=False), issue.str.contains('⚠️', regex=False)],
+                ['background-color: #ffebee; color: black', 'background-color: #fff3e0; color: black', 'background-color: #fff8e1; color: black'],
+                default='color: black')
+            st.dataframe(df.style.apply(lambda col: row_css, axis=0), use_container_width=True, hide_index=True)
         else:
             st.success("✅ Perfect Match!")
 
@@ -1,8 +1,32 @@
+from concurrent.futures import ThreadPoolExecutor
+from botocore.config import Config
+
+def _export_one(apig, api_id, name, stage_name):
+    print(f"   ... Exporting {name} (Stage: {stage_name})")
+    try:
+        export = apig.get_export(
+            restApiId=api_id,
+            stageName=stage_name,
+            exportType='oas30',
+            parameters={'extensions': 'integrations'}
+        )
+        return name, stage_name, json.loads(export['body'].read())
+    except Exception as e:
+        print(f"   ❌ Export Failed for {name} [{stage_name}]: {e}")
+        return name, stage_name, None
+
 def scan_api_gateway():
     print(f"\n🌐 SCANNING API GATEWAY")
-    apig = boto3.client('apigateway', region_name=CURRENT_REGION)
+    # Adaptive retries back off client-side when the parallel exports hit API Gateway throttling
+    apig = boto3.client('apigateway', region_name=CURRENT_REGION,
+                        config=Config(retries={'mode': 'adaptive', 'max_attempts': 10}))
     try:
-        apis = apig.get_rest_apis()['items']
+        # get_rest_apis pages at 25 items by default, so walk every page
+        paginator = apig.get_paginator('get_rest_apis')
+        apis = (api for page in paginator.paginate() for api in page['items'])
+
+        # Flatten to (api_id, name, stage) first so every export can run concurrently
+        triples = []
         for api in apis:
             api_id = api['id']
             name = api['name']
@@ -15,21 +39,13 @@ def scan_api_gateway():
                 
             # Export ALL stages (usually just one per environment)
             for stage_info in stages['item']:
-                stage_name = stage_info['stageName']
-                print(f"   ... Exporting {name} (Stage: {stage_name})")
+                triples.append((api_id, name, stage_info['stageName']))
 
-                try:
-                    export = apig.get_export(
-                        restApiId=api_id,
-                        stageName=stage_name,
-                        exportType='oas30',
-                        parameters={'extensions': 'integrations'}
-                    )
-                    body = json.loads(export['body'].read())
-                    # Save with stage name included
-                    save_json("api_gateway", f"{name}_{stage_name}", body)
-                except Exception as e:
-                    print(f"   ❌ Export Failed for {name} [{stage_name}]: {e}")
+        # Each get_export is a slow round-trip; 10 workers stays around API Gateway's default TPS
+        with ThreadPoolExecutor(max_workers=10) as ex:
+            for name, stage_name, body in ex.map(lambda t: _export_one(apig, *t), triples):
+                # Save with stage name included
+                if body is not None: save_json("api_gateway", f"{name}_{stage_name}", body)
 
     except Exception as e: 
         print(f"API GW Error: {e}")
@@ -1,237 +1,251 @@
 # ==========================================
 # API GATEWAY HELPER FUNCTIONS (Add after S3 logic, before main app)
 # ==========================================
+import functools
+import orjson
 
-def normalize_integration(method_data):
-    """Extracts integration details for comparison"""
-    if 'x-amazon-apigateway-integration' not in method_data:
-        return None
-    
-    integ = method_data['x-amazon-apigateway-integration']
-    return {
-        'type': integ.get('type'),
-        'uri': integ.get('uri', ''),
-        'httpMethod': integ.get('httpMethod'),
-        'timeoutInMillis': integ.get('timeoutInMillis'),
-        'passthroughBehavior': integ.get('passthroughBehavior'),
-        'requestParameters': integ.get('requestParameters', {}),
-        'responses': integ.get('responses', {})
-    }
+_SKIP_METHOD_KEYS = frozenset({'parameters', 'x-amazon-apigateway-any-method'})  # path-level metadata, not methods
+_METHOD_UPPER = {m: m.upper() for m in ('get', 'put', 'post', 'delete', 'patch', 'options', 'head', 'trace', 'connect')}
 
+# Top-level OAS keys the dashboards read; components (schemas, security schemes) etc. aren't kept in the cache
+_API_GW_KEEP = ('openapi', 'info', 'paths')
+
+@st.cache_data(show_spinner=False)
+def _load_api_json(path, mtime):
+    """Parses one API Gateway export with orjson and keeps only _API_GW_KEEP; mtime is only part of the cache key so edits are re-read"""
+    with open(path, 'rb') as f:
+        doc = orjson.loads(f.read())
+    return {k: doc[k] for k in _API_GW_KEEP if k in doc}
+
+@functools.lru_cache(maxsize=4096)
 def extract_lambda_function(uri):
-    """Extracts just the function name from Lambda ARN for comparison"""
-    if not uri or 'lambda' not in uri.lower():
+    """Extracts just the function name from Lambda ARN for comparison (same ARN recurs across methods, so cached)"""
+    if not uri:
         return uri
     # arn:aws:lambda:us-east-1:123456:function/my-function-name
-    parts = uri.split(':function/')
-    if len(parts) > 1:
-        return parts[1].split('/')[0]  # Get function name
-    return uri
+    i = uri.find(':function/')
+    if i < 0:
+        return uri
+    rest = uri[i + 10:]
+    j = rest.find('/')
+    return rest if j < 0 else rest[:j]  # Get function name
 
-def render_api_gateway_dashboard(src_json, tgt_json):
-    """Compares two API Gateway exports"""
+def _diff_integration(si, ti, path, method_upper, crit, warn, uri_verdict):
+    """Field-by-field diff of two raw x-amazon-apigateway-integration blocks (read straight off the dicts, no normalized copy)"""
+    s_type, s_uri, s_http, s_timeout = si.get('type'), si.get('uri', ''), si.get('httpMethod'), si.get('timeoutInMillis')
+    t_type, t_uri, t_http, t_timeout = ti.get('type'), ti.get('uri', ''), ti.get('httpMethod'), ti.get('timeoutInMillis')
+    issues = []
+    
+    # Type mismatch
+    if s_type != t_type:
+        issues.append(f"Type: {s_type} → {t_type}")
+        crit.append(f"{path} [{method_upper}] Integration Type Mismatch")
+    
+    # URI comparison (smart Lambda comparison)
+    if s_uri != t_uri:
+        # One Lambda usually backs many routes, so the same URI pair recurs; verdict is (src_func, tgt_func) or False
+        key = (s_uri, t_uri)
+        verdict = uri_verdict.get(key)
+        if verdict is None:
+            src_func = extract_lambda_function(s_uri)
+            tgt_func = extract_lambda_function(t_uri)
+            verdict = uri_verdict[key] = (src_func, tgt_func) if src_func != tgt_func else False
+        if verdict:
+            issues.append(f"URI: {verdict[0]} → {verdict[1]}")
+            crit.append(f"{path} [{method_upper}] Lambda Function Mismatch")
+    
+    # Timeout comparison
+    if s_timeout != t_timeout:
+        issues.append(f"Timeout: {s_timeout}ms → {t_timeout}ms")
+        warn.append(f"{path} [{method_upper}] Timeout Difference")
+    
+    # HTTP Method mismatch
+    if s_http != t_http:
+        issues.append(f"HTTP Method: {s_http} → {t_http}")
+        crit.append(f"{path} [{method_upper}] HTTP Method Mismatch")
+    
+    return issues
+
+def compute_api_diff(src_json, tgt_json):
+    """Pure comparison of two API Gateway exports (no st.* calls)"""
     report = {"Critical": [], "Warnings": [], "Info": []}
+    crit = report["Critical"]
+    warn = report["Warnings"]
+    info = report["Info"]
     
     src_paths = src_json.get('paths', {})
     tgt_paths = tgt_json.get('paths', {})
     
-    # Metrics
-    total_paths_src = len(src_paths)
-    total_paths_tgt = len(tgt_paths)
-    missing_paths = []
-    extra_paths = []
-    method_issues = []
+    missing_methods = []
+    extra_methods = []
     integration_issues = []
+    uri_verdict = {}  # (src_uri, tgt_uri) -> Lambda mismatch verdict, scoped to this diff
     
     # --- PATH ANALYSIS ---
-    all_paths = sorted(set(src_paths.keys()) | set(tgt_paths.keys()))
-    
-    for path in all_paths:
-        # Missing in target
-        if path not in tgt_paths:
-            missing_paths.append(path)
-            report["Critical"].append(f"Missing Path: {path}")
-            continue
-        
-        # Extra in target (exists in target but not source)
-        if path not in src_paths:
-            extra_paths.append(path)
-            report["Info"].append(f"Extra Path in Target: {path}")
-            continue
-        
-        # Path exists in both - compare methods
+    src_keys = src_paths.keys()
+    tgt_keys = tgt_paths.keys()
+    
+    # Missing in target
+    missing_paths = sorted(src_keys - tgt_keys)
+    crit.extend([f"Missing Path: {path}" for path in missing_paths])
+    
+    # Extra in target (exists in target but not source)
+    extra_paths = sorted(tgt_keys - src_keys)
+    info.extend([f"Extra Path in Target: {path}" for path in extra_paths])
+    
+    # Path exists in both - compare methods (sorted: the report lists are filled in this order, and
+    # string-set order changes with the hash seed, so an unsorted walk gives a different report every run)
+    for path in sorted(src_keys & tgt_keys):
         src_methods = src_paths[path]
         tgt_methods = tgt_paths[path]
+        src_m = src_methods.keys() - _SKIP_METHOD_KEYS
+        tgt_m = tgt_methods.keys() - _SKIP_METHOD_KEYS
         
-        all_methods = set(src_methods.keys()) | set(tgt_methods.keys())
+        # Missing method in target
+        for method in sorted(src_m - tgt_m):
+            method_upper = _METHOD_UPPER.get(method) or method.upper()
+            missing_methods.append((path, method_upper))
+            crit.append(f"Missing Method: {path} [{method_upper}]")
         
-        for method in all_methods:
-            if method in ['parameters', 'x-amazon-apigateway-any-method']:
-                continue  # Skip metadata
-            
-            method_upper = method.upper()
-            
-            # Missing method in target
-            if method not in tgt_methods:
-                method_issues.append((path, method_upper, "Missing in Target"))
-                report["Critical"].append(f"Missing Method: {path} [{method_upper}]")
-                continue
+        # Extra method in target
+        for method in sorted(tgt_m - src_m):
+            method_upper = _METHOD_UPPER.get(method) or method.upper()
+            extra_methods.append((path, method_upper))
+            info.append(f"Extra Method in Target: {path} [{method_upper}]")
+        
+        for method in sorted(src_m & tgt_m):
+            method_upper = _METHOD_UPPER.get(method) or method.upper()
             
-            # Extra method in target
-            if method not in src_methods:
-                method_issues.append((path, method_upper, "Extra in Target"))
-                report["Info"].append(f"Extra Method in Target: {path} [{method_upper}]")
+            # Path-level extras (summary, description, servers, ...) are str/list, not operations
+            src_op = src_methods[method]
+            tgt_op = tgt_methods[method]
+            if not isinstance(src_op, dict) or not isinstance(tgt_op, dict):
                 continue
             
-            # Compare integrations
-            src_integ = normalize_integration(src_methods[method])
-            tgt_integ = normalize_integration(tgt_methods[method])
-            
-            if not src_integ or not tgt_integ:
+            # Compare integrations (identical raw blocks can't drift, so skip them outright)
+            si = src_op.get('x-amazon-apigateway-integration')
+            ti = tgt_op.get('x-amazon-apigateway-integration')
+            if si is None or ti is None or si is ti or si == ti:
                 continue
             
-            issues = []
-            
-            # Type mismatch
-            if src_integ['type'] != tgt_integ['type']:
-                issues.append(f"Type: {src_integ['type']} → {tgt_integ['type']}")
-                report["Critical"].append(f"{path} [{method_upper}] Integration Type Mismatch")
-            
-            # URI comparison (smart Lambda comparison)
-            src_uri = src_integ['uri']
-            tgt_uri = tgt_integ['uri']
-            src_func = extract_lambda_function(src_uri)
-            tgt_func = extract_lambda_function(tgt_uri)
-            
-            if src_func != tgt_func:
-                issues.append(f"URI: {src_func} → {tgt_func}")
-                report["Critical"].append(f"{path} [{method_upper}] Lambda Function Mismatch")
-            
-            # Timeout comparison
-            src_timeout = src_integ.get('timeoutInMillis', 29000)
-            tgt_timeout = tgt_integ.get('timeoutInMillis', 29000)
-            if src_timeout != tgt_timeout:
-                issues.append(f"Timeout: {src_timeout}ms → {tgt_timeout}ms")
-                report["Warnings"].append(f"{path} [{method_upper}] Timeout Difference")
-            
-            # HTTP Method mismatch
-            if src_integ['httpMethod'] != tgt_integ['httpMethod']:
-                issues.append(f"HTTP Method: {src_integ['httpMethod']} → {tgt_integ['httpMethod']}")
-                report["Critical"].append(f"{path} [{method_upper}] HTTP Method Mismatch")
-            
+            issues = _diff_integration(si, ti, path, method_upper, crit, warn, uri_verdict)
             if issues:
                 integration_issues.append((path, method_upper, issues))
     
+    return report, missing_paths, extra_paths, missing_methods, extra_methods, integration_issues
+
+# Markdown line templates for the Critical section, filled with % and sent as one st.markdown call
+_MISSING_PATH_MD = "- ❌ **Missing Path** `%s` — this entire endpoint is missing in Target"
+_MISSING_METHOD_MD = "- ⚠️ **Missing Method** `%s` **[%s]** — path exists but this HTTP method is not configured"
+_DRIFT_MD = "#### 🔧 Configuration Drift: `%s` [%s]\n%s"
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def _compute_api_diff_cached(cache_key, _src_json, _tgt_json):
+    # The exports are big dicts, so they're excluded from hashing (leading underscore); cache_key identifies them
+    return compute_api_diff(_src_json, _tgt_json)
+
+def render_api_gateway_dashboard(src_json, tgt_json, cache_key=None):
+    """Compares two API Gateway exports; pass a cache_key (dump folders + their signatures + selections) to skip recomputing on reruns"""
+    if cache_key is None:
+        report, missing_paths, extra_paths, missing_methods, extra_methods, integration_issues = compute_api_diff(src_json, tgt_json)
+    else:
+        report, missing_paths, extra_paths, missing_methods, extra_methods, integration_issues = _compute_api_diff_cached(cache_key, src_json, tgt_json)
+    
+    # Metrics
+    total_paths_src = len(src_json.get('paths', {}))
+    total_paths_tgt = len(tgt_json.get('paths', {}))
+    
     # --- RENDER UI ---
     col1, col2, col3, col4 = st.columns(4)
     col1.metric("Total Paths", f"{total_paths_tgt}", delta=f"{total_paths_tgt - total_paths_src}" if total_paths_src != total_paths_tgt else None)
     col2.metric("Missing Paths", len(missing_paths))
-    col3.metric("Method Issues", len(method_issues))
+    col3.metric("Method Issues", len(missing_methods) + len(extra_methods))
     col4.metric("Integration Issues", len(integration_issues))
     
     st.divider()
     
     # Critical Issues
-    if missing_paths or any(issue[2] == "Missing in Target" for issue in method_issues) or integration_issues:
+    if missing_paths or missing_methods or integration_issues:
         st.error(f"🔴 Critical Issues Found")
         
-        # Missing Paths
+        # Whole section as plain Markdown in one call: no per-card HTML for the frontend to sanitize
+        sections = []
         if missing_paths:
-            st.markdown("### Missing Endpoints")
-            for path in missing_paths:
-                st.markdown(f"""
-                <div class='resource-card' style='border-left: 5px solid #c62828;'>
-                    <b>❌ Missing Path</b><br>
-                    <code>{path}</code><br>
-                    <span class='badge-crit'>This entire endpoint is missing in Target</span>
-                </div>
-                """, unsafe_allow_html=True)
-        
-        # Missing Methods
-        missing_methods = [m for m in method_issues if m[2] == "Missing in Target"]
+            sections.append("\n".join(["### Missing Endpoints"] + [_MISSING_PATH_MD % path for path in missing_paths]))
         if missing_methods:
-            st.markdown("### Missing Methods")
-            for path, method, _ in missing_methods:
-                st.markdown(f"""
-                <div class='resource-card' style='border-left: 5px solid #d32f2f;'>
-                    <b>⚠️ Missing Method</b><br>
-                    <code>{path}</code> <span class='badge-crit'>[{method}]</span><br>
-                    Path exists but this HTTP method is not configured
-                </div>
-                """, unsafe_allow_html=True)
-        
-        # Integration Issues
+            sections.append("\n".join(["### Missing Methods"] + [_MISSING_METHOD_MD % pm for pm in missing_methods]))
         if integration_issues:
-            st.markdown("### Integration Configuration Issues")
-            for path, method, issues_list in integration_issues:
-                issues_html = "<br>".join([f"• {i}" for i in issues_list])
-                st.markdown(f"""
-                <div class='resource-card' style='border-left: 5px solid #f57c00;'>
-                    <b>🔧 Configuration Drift</b><br>
-                    <code>{path}</code> <span class='badge-warn'>[{method}]</span><br>
-                    <hr style='margin: 8px 0'>
-                    {issues_html}
-                </div>
-                """, unsafe_allow_html=True)
+            sections.append("\n\n".join(["### Integration Configuration Issues"] +
+                                         [_DRIFT_MD % (path, method, "\n".join([f"- {i}" for i in issues_list]))
+                                          for path, method, issues_list in integration_issues]))
+        st.markdown("\n\n".join(sections))
     
     # Info - Extra paths/methods
-    if extra_paths or any(issue[2] == "Extra in Target" for issue in method_issues):
-        with st.expander(f"ℹ️ Extra Resources in Target ({len(extra_paths)} paths, {len([m for m in method_issues if m[2] == 'Extra in Target'])} methods)"):
+    if extra_paths or extra_methods:
+        with st.expander(f"ℹ️ Extra Resources in Target ({len(extra_paths)} paths, {len(extra_methods)} methods)"):
             if extra_paths:
                 st.markdown("**Extra Paths:**")
                 for path in extra_paths:
                     st.code(path)
-            extra_methods = [m for m in method_issues if m[2] == "Extra in Target"]
             if extra_methods:
                 st.markdown("**Extra Methods:**")
-                for path, method, _ in extra_methods:
+                for path, method in extra_methods:
                     st.code(f"{path} [{method}]")
     
     # Success state
-    if not missing_paths and not method_issues and not integration_issues:
+    if not missing_paths and not missing_methods and not extra_methods and not integration_issues:
         st.success("✅ API Gateway Configurations Match Perfectly!")
     
     return report
 
 
+@st.cache_data(show_spinner=False)
+def _api_names(folder_key, _api_gw):
+    """Sorted export names for one dump; folder_key (folder + dump signature) stands in for the (unhashed) dump dict"""
+    return sorted(_api_gw.keys())
+
+@st.cache_data(show_spinner=False)
+def _api_index(folder_key, names):
+    """{name: position} for a selectbox option list, built once per dump"""
+    return {name: i for i, name in enumerate(names)}
+
+@st.cache_data(show_spinner=False, max_entries=1024)
+def _predict_target(sel_src, tgt_names):
+    return find_best_match(sel_src, list(tgt_names))
+
+
 # ==========================================
 # REPLACE YOUR EXISTING "with tab3:" SECTION WITH THIS
 # ==========================================
 
 with tab3:
     col_sel_1, col_sel_2 = st.columns(2)
-    src_list = sorted(list(data_a["api_gw"].keys()))
+    src_list = _api_names((path_a, DUMP_SIGNATURES.get(path_a)), data_a["api_gw"])
     
     if not src_list:
         st.info("No API Gateway exports found in source dump.")
         st.stop()
     
     sel_src = col_sel_1.selectbox("Source API", src_list, key="api_src")
-    tgt_list = sorted(list(data_b["api_gw"].keys()))
+    tgt_list = _api_names((path_b, DUMP_SIGNATURES.get(path_b)), data_b["api_gw"])
     
     if not tgt_list:
         st.info("No API Gateway exports found in target dump.")
         st.stop()
     
-    predicted = find_best_match(sel_src, tgt_list)
-    try: 
-        idx = tgt_list.index(predicted) if predicted else 0
-    except: 
-        idx = 0
+    predicted = _predict_target(sel_src, tuple(tgt_list))
+    idx = _api_index(path_b, tuple(tgt_list)).get(predicted, 0) if predicted else 0
     
     sel_tgt = col_sel_2.selectbox("Target API", tgt_list, index=idx, key="api_tgt")
     
     if sel_src and sel_tgt:
         st.subheader(f"Comparing: {sel_src} → {sel_tgt}")
-        rpt = render_api_gateway_dashboard(data_a["api_gw"][sel_src], data_b["api_gw"][sel_tgt])
-        
-        # Download Report
-        md = f"# API Gateway Report: {sel_src} vs {sel_tgt}\n\n"
-        for category, items in rpt.items():
-            if items:
-                md += f"## {category}\n"
-                for item in items:
-                    md += f"- {item}\n"
-                md += "\n"
+        # Dump signatures version the key: a re-collection into the same folders gets a fresh diff
+        rpt = render_api_gateway_dashboard(data_a["api_gw"][sel_src], data_b["api_gw"][sel_tgt],
+                                           cache_key=(path_a, DUMP_SIGNATURES.get(path_a), sel_src,
+                                                      path_b, DUMP_SIGNATURES.get(path_b), sel_tgt))
         
-        st.download_button("📥 Download API Gateway Report", md, "api_gateway_report.md", key="dl_api")
+        # Download Report (built only when the button is clicked, not on every rerun)
+        st.download_button("📥 Download API Gateway Report",
+                           data=lambda rpt=rpt, sel_src=sel_src, sel_tgt=sel_tgt: _build_md_report("API Gateway Report", rpt, sel_src, sel_tgt),
+                           file_name="api_gateway_report.md", key="dl_api")
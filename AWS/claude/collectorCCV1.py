@@ -1,111 +1,191 @@
 import boto3
-import json
+import functools
+import orjson
 import os
 import datetime
 import sys
-import hashlib
+import mimetypes
 import re
+import threading
+import xxhash
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
+from botocore.config import Config
 
 # CONFIG
 CURRENT_REGION = os.environ.get('AWS_REGION', 'us-east-1')
 TIMESTAMP = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M")
 BASE_DIR = f"aws_dump_{CURRENT_REGION}_{TIMESTAMP}"
 
+_CLIENT_LOCK = threading.Lock()
+# Bigger HTTP pool for the thread fan-outs (botocore's default is 10); adaptive retries absorb throttling;
+# keepalive stops idle pooled connections being dropped between scanners
+_CFG = Config(max_pool_connections=64, retries={'max_attempts': 10, 'mode': 'adaptive'}, tcp_keepalive=True)
+
+@functools.lru_cache(maxsize=None)
+def _client(service, region_name=CURRENT_REGION):
+    """One shared client per (service, region); clients are thread-safe, building them isn't"""
+    with _CLIENT_LOCK:
+        return boto3.client(service, region_name=region_name, config=_CFG)
+
+_DIR_CACHE = set()
+_DIR_LOCK = threading.Lock()
+
+def _ensure_dir(path):
+    """mkdir -p, remembered so repeat saves into the same folder skip the syscall"""
+    if path in _DIR_CACHE:
+        return
+    with _DIR_LOCK:
+        os.makedirs(path, exist_ok=True)
+        _DIR_CACHE.add(path)
+
+class _SafeNameTable(dict):
+    """str.translate table for file names: alphanumerics and -_. kept, everything else -> '_' (filled in per code point on first sight)"""
+    def __missing__(self, cp):
+        c = chr(cp)
+        self[cp] = cp if c.isalnum() or c in '-_.' else 0x5F
+        return self[cp]
+
+_SAFE_NAME_TABLE = _SafeNameTable()
+
 def save_json(service, name, data, subfolder=None):
     path = os.path.join(BASE_DIR, service)
     if subfolder: path = os.path.join(path, subfolder)
-    if not os.path.exists(path): os.makedirs(path)
-    safe_name = "".join([c if c.isalnum() or c in ('-','_','.') else '_' for c in name])
+    _ensure_dir(path)
+    safe_name = name.translate(_SAFE_NAME_TABLE)
     
-    def json_serial(obj):
-        if isinstance(obj, (datetime.datetime, datetime.date)): return obj.isoformat()
-        return str(obj)
-
-    with open(os.path.join(path, f"{safe_name}.json"), 'w') as f:
-        json.dump(data, f, indent=2, default=json_serial)
+    # orjson writes datetimes natively (ISO 8601); anything else it can't encode falls back to str()
+    data_bytes = orjson.dumps(data, default=str, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    # Already one complete bytes object, so skip the BufferedWriter layer and hand it to a single write() syscall
+    with open(os.path.join(path, f"{safe_name}.json"), 'wb', buffering=0) as f:
+        f.write(data_bytes)
     print(f"   [+] Saved {service}: {name}")
 
+_VERSION_RE = re.compile(r'_v?(\d+\.\d+\.\d+)')
+
 def extract_version_from_filename(filename):
     """Extract version from filename like: documentation_v1.2.3.docx"""
-    match = re.search(r'_v?(\d+\.\d+\.\d+)', filename)
-    if match:
-        return match.group(1)
-    return None
+    match = _VERSION_RE.search(filename)
+    return match.group(1) if match else None
+
+# Suffix tuples for str.endswith (checked in C, built once)
+_SKIP_IMAGE = ('.jpg', '.jpeg', '.png', '.gif', '.svg', '.ico', '.webp', '.bmp')
+_SKIP_VIDEO = ('.mp4', '.mov', '.avi', '.mkv', '.flv')
+_SKIP_ARCHIVE = ('.zip', '.tar', '.gz', '.rar', '.7z')  # optional, not applied
+_MAX_SIZE = 10 * 1024 * 1024  # 10MB in bytes
 
 def should_skip_file(filename, size):
     """Determine if file should be skipped"""
-    # Skip images
-    image_extensions = ['.jpg', '.jpeg', '.png', '.gif', '.svg', '.ico', '.webp', '.bmp']
-    # Skip videos
-    video_extensions = ['.mp4', '.mov', '.avi', '.mkv', '.flv']
-    # Skip archives (optional)
-    archive_extensions = ['.zip', '.tar', '.gz', '.rar', '.7z']
-    
     file_lower = filename.lower()
     
-    for ext in image_extensions:
-        if file_lower.endswith(ext):
-            return True, "image_file_skipped"
+    # Skip images
+    if file_lower.endswith(_SKIP_IMAGE):
+        return True, "image_file_skipped"
     
-    for ext in video_extensions:
-        if file_lower.endswith(ext):
-            return True, "video_file_skipped"
+    # Skip videos
+    if file_lower.endswith(_SKIP_VIDEO):
+        return True, "video_file_skipped"
     
     # Skip files larger than 10MB
-    if size > 10 * 1024 * 1024:  # 10MB in bytes
+    if size > _MAX_SIZE:
         return True, "file_size_exceeds_limit"
     
     return False, None
 
+_ECS_LOCK = threading.Lock()
+_TD_CACHE = {}  # taskDefinition ARN -> described TD (None if it couldn't be described)
+
+def _describe_task_definitions(ecs, td_arns):
+    """Fills _TD_CACHE for any of td_arns not described yet, side by side; returns the cache"""
+    def _describe_td(td_arn):
+        try:
+            return ecs.describe_task_definition(taskDefinition=td_arn)['taskDefinition']
+        except Exception as e:
+            print(f"   ⚠️ Could not describe task definition {td_arn}: {e}")
+            return None
+    
+    todo = [arn for arn in set(td_arns) if arn not in _TD_CACHE]
+    if todo:
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            _TD_CACHE.update(zip(todo, executor.map(_describe_td, todo)))
+    return _TD_CACHE
+
+@functools.lru_cache(maxsize=None)
+def _walk_ecs_inventory():
+    ecs = _client('ecs', region_name=CURRENT_REGION)
+    services_by_cluster = {}
+    for cluster_arn in ecs.list_clusters().get('clusterArns', []):
+        svc_arns = ecs.list_services(cluster=cluster_arn).get('serviceArns')
+        services_by_cluster[cluster_arn] = ecs.describe_services(cluster=cluster_arn, services=svc_arns)['services'] if svc_arns else []
+    
+    # Services often share a TD revision, so each unique ARN is described once
+    td_cache = _describe_task_definitions(ecs, [s['taskDefinition'] for svcs in services_by_cluster.values() for s in svcs])
+    
+    return {
+        cluster_arn: {s['serviceName']: {'service': s, 'task_def': td_cache[s['taskDefinition']]} for s in svcs}
+        for cluster_arn, svcs in services_by_cluster.items()
+    }
+
+def _get_ecs_inventory():
+    """{cluster_arn: {service_name: {'service': ..., 'task_def': ...}}}, walked once and shared by the ECS/SG/IAM scanners"""
+    with _ECS_LOCK:  # scanners run concurrently; the first caller walks, the rest wait for its result
+        return _walk_ecs_inventory()
+
 def scan_ecs_cluster(cluster_name):
     print(f"\n🚀 SCANNING ECS CLUSTER: {cluster_name}")
-    ecs = boto3.client('ecs', region_name=CURRENT_REGION)
+    ecs = _client('ecs', region_name=CURRENT_REGION)
     try:
         # Cluster
         resp = ecs.describe_clusters(clusters=[cluster_name])
         if not resp['clusters']: print("❌ Cluster not found"); return
-        save_json("ecs_focused", "cluster_config", resp['clusters'][0])
+        cluster = resp['clusters'][0]
+        save_json("ecs_focused", "cluster_config", cluster)
         
         # Services & Tasks
-        svcs = ecs.list_services(cluster=cluster_name)['serviceArns']
-        if svcs:
-            desc_svcs = ecs.describe_services(cluster=cluster_name, services=svcs)['services']
-            for s in desc_svcs:
-                save_json("ecs_focused", s['serviceName'], s, subfolder="services")
-                # Fetch TD
-                td_arn = s['taskDefinition']
-                td = ecs.describe_task_definition(taskDefinition=td_arn)['taskDefinition']
-                family = td['family']
-                save_json("ecs_focused", f"{family}", td, subfolder="task_definitions")
+        for service_name, entry in _get_ecs_inventory().get(cluster['clusterArn'], {}).items():
+            save_json("ecs_focused", service_name, entry['service'], subfolder="services")
+            td = entry['task_def']
+            if td:
+                save_json("ecs_focused", f"{td['family']}", td, subfolder="task_definitions")
     except Exception as e: print(f"ECS Error: {e}")
 
 def scan_s3_buckets():
     print(f"\n📦 SCANNING S3 BUCKETS ({CURRENT_REGION})")
-    s3 = boto3.client('s3')
+    s3 = _client('s3', region_name=None)
+    
+    def _bucket_region(name):
+        try:
+            loc = s3.get_bucket_location(Bucket=name)['LocationConstraint']
+            return loc or 'us-east-1'
+        except: return None
+    
+    def _policy(name):
+        try: return orjson.loads(s3.get_bucket_policy(Bucket=name)['Policy'])
+        except: return None
+    
+    def _encryption(name):
+        try: return s3.get_bucket_encryption(Bucket=name)['ServerSideEncryptionConfiguration']
+        except: return None
+    
+    def _versioning(name):
+        try: return s3.get_bucket_versioning(Bucket=name).get('Status', 'Suspended')
+        except: return 'Suspended'
+    
     try:
-        for b in s3.list_buckets()['Buckets']:
-            name = b['Name']
-            try:
-                loc = s3.get_bucket_location(Bucket=name)['LocationConstraint']
-                if loc is None: loc = 'us-east-1'
-                if loc != CURRENT_REGION: continue
-                
-                config = {"Name": name}
-                try: config['Policy'] = json.loads(s3.get_bucket_policy(Bucket=name)['Policy'])
-                except: config['Policy'] = None
-                try: config['Encryption'] = s3.get_bucket_encryption(Bucket=name)['ServerSideEncryptionConfiguration']
-                except: config['Encryption'] = None
-                try: config['Versioning'] = s3.get_bucket_versioning(Bucket=name).get('Status', 'Suspended')
-                except: config['Versioning'] = 'Suspended'
-                
+        names = [b['Name'] for b in s3.list_buckets()['Buckets']]
+        with ThreadPoolExecutor(max_workers=32) as ex:
+            # Region filter first (most buckets usually live elsewhere), then the 3 config calls per kept bucket side by side
+            kept = [name for name, loc in zip(names, ex.map(_bucket_region, names)) if loc == CURRENT_REGION]
+            pending = [(name, ex.submit(_policy, name), ex.submit(_encryption, name), ex.submit(_versioning, name)) for name in kept]
+            for name, policy, encryption, versioning in pending:
+                config = {"Name": name, "Policy": policy.result(), "Encryption": encryption.result(), "Versioning": versioning.result()}
                 save_json("s3_buckets", name, config)
-            except: continue
     except Exception as e: print(f"S3 Error: {e}")
 
 def scan_api_gateway():
     print(f"\n🌐 SCANNING API GATEWAY")
-    apig = boto3.client('apigateway', region_name=CURRENT_REGION)
+    apig = _client('apigateway', region_name=CURRENT_REGION)
     try:
         apis = apig.get_rest_apis()['items']
         for api in apis:
@@ -130,7 +210,7 @@ def scan_api_gateway():
                         exportType='oas30',
                         parameters={'extensions': 'integrations'}
                     )
-                    body = json.loads(export['body'].read())
+                    body = orjson.loads(export['body'].read())
                     # Save with stage name included
                     save_json("api_gateway", f"{name}_{stage_name}", body)
                 except Exception as e:
@@ -139,10 +219,20 @@ def scan_api_gateway():
     except Exception as e: 
         print(f"API GW Error: {e}")
 
+# (field, default) pairs copied from each list_functions entry; the dashboards .get() into the dict/list ones
+_LAMBDA_FIELDS = (
+    ('FunctionName', None), ('FunctionArn', None), ('Runtime', None), ('Role', None), ('Handler', None),
+    ('Timeout', None), ('MemorySize', None), ('Environment', {}), ('VpcConfig', {}), ('DeadLetterConfig', {}),
+    ('Layers', []), ('ReservedConcurrentExecutions', None), ('LastModified', None), ('CodeSize', None), ('CodeSha256', None)
+)
+
 def scan_lambda_functions():
     print(f"\n⚡ SCANNING LAMBDA FUNCTIONS")
-    lambda_client = boto3.client('lambda', region_name=CURRENT_REGION)
+    lambda_client = _client('lambda', region_name=CURRENT_REGION)
+    
     try:
+        # Everything kept is already in the list_functions entries, so there are no per-function API calls;
+        # each function is just a local file write
         paginator = lambda_client.get_paginator('list_functions')
         for page in paginator.paginate():
             for func in page['Functions']:
@@ -150,28 +240,7 @@ def scan_lambda_functions():
                 print(f"   ... Processing Lambda: {func_name}")
                 
                 try:
-                    # Get full function configuration
-                    full_config = lambda_client.get_function(FunctionName=func_name)
-                    
-                    # Extract relevant configuration
-                    config = {
-                        "FunctionName": func_name,
-                        "FunctionArn": func['FunctionArn'],
-                        "Runtime": func.get('Runtime'),
-                        "Role": func.get('Role'),
-                        "Handler": func.get('Handler'),
-                        "Timeout": func.get('Timeout'),
-                        "MemorySize": func.get('MemorySize'),
-                        "Environment": func.get('Environment', {}),
-                        "VpcConfig": func.get('VpcConfig', {}),
-                        "DeadLetterConfig": func.get('DeadLetterConfig', {}),
-                        "Layers": func.get('Layers', []),
-                        "ReservedConcurrentExecutions": func.get('ReservedConcurrentExecutions'),
-                        "LastModified": func.get('LastModified'),
-                        "CodeSize": func.get('CodeSize'),
-                        "CodeSha256": func.get('CodeSha256')
-                    }
-                    
+                    config = {k: func.get(k, default) for k, default in _LAMBDA_FIELDS}
                     save_json("lambda_functions", func_name, config)
                     
                 except Exception as e:
@@ -182,64 +251,75 @@ def scan_lambda_functions():
 
 def scan_sqs_queues():
     print(f"\n📬 SCANNING SQS QUEUES")
-    sqs = boto3.client('sqs', region_name=CURRENT_REGION)
+    sqs = _client('sqs', region_name=CURRENT_REGION)
+    
+    def _process_one(queue_url):
+        queue_name = queue_url.split('/')[-1]
+        print(f"   ... Processing Queue: {queue_name}")
+        
+        try:
+            # Get all queue attributes
+            attrs = sqs.get_queue_attributes(
+                QueueUrl=queue_url,
+                AttributeNames=['All']
+            )
+            
+            config = {
+                "QueueName": queue_name,
+                "QueueUrl": queue_url,
+                "QueueArn": attrs['Attributes'].get('QueueArn'),
+                "VisibilityTimeout": attrs['Attributes'].get('VisibilityTimeout'),
+                "MessageRetentionPeriod": attrs['Attributes'].get('MessageRetentionPeriod'),
+                "MaximumMessageSize": attrs['Attributes'].get('MaximumMessageSize'),
+                "DelaySeconds": attrs['Attributes'].get('DelaySeconds'),
+                "ReceiveMessageWaitTimeSeconds": attrs['Attributes'].get('ReceiveMessageWaitTimeSeconds'),
+                "RedrivePolicy": attrs['Attributes'].get('RedrivePolicy'),
+                "KmsMasterKeyId": attrs['Attributes'].get('KmsMasterKeyId'),
+                "CreatedTimestamp": attrs['Attributes'].get('CreatedTimestamp'),
+                "LastModifiedTimestamp": attrs['Attributes'].get('LastModifiedTimestamp')
+            }
+            
+            save_json("sqs_queues", queue_name, config)
+            
+        except Exception as e:
+            print(f"   ❌ Failed to process {queue_name}: {e}")
+    
     try:
         queues = sqs.list_queues()
         if 'QueueUrls' not in queues:
             print("   No queues found")
             return
-            
-        for queue_url in queues['QueueUrls']:
-            queue_name = queue_url.split('/')[-1]
-            print(f"   ... Processing Queue: {queue_name}")
-            
-            try:
-                # Get all queue attributes
-                attrs = sqs.get_queue_attributes(
-                    QueueUrl=queue_url,
-                    AttributeNames=['All']
-                )
-                
-                config = {
-                    "QueueName": queue_name,
-                    "QueueUrl": queue_url,
-                    "QueueArn": attrs['Attributes'].get('QueueArn'),
-                    "VisibilityTimeout": attrs['Attributes'].get('VisibilityTimeout'),
-                    "MessageRetentionPeriod": attrs['Attributes'].get('MessageRetentionPeriod'),
-                    "MaximumMessageSize": attrs['Attributes'].get('MaximumMessageSize'),
-                    "DelaySeconds": attrs['Attributes'].get('DelaySeconds'),
-                    "ReceiveMessageWaitTimeSeconds": attrs['Attributes'].get('ReceiveMessageWaitTimeSeconds'),
-                    "RedrivePolicy": attrs['Attributes'].get('RedrivePolicy'),
-                    "KmsMasterKeyId": attrs['Attributes'].get('KmsMasterKeyId'),
-                    "CreatedTimestamp": attrs['Attributes'].get('CreatedTimestamp'),
-                    "LastModifiedTimestamp": attrs['Attributes'].get('LastModifiedTimestamp')
-                }
-                
-                save_json("sqs_queues", queue_name, config)
-                
-            except Exception as e:
-                print(f"   ❌ Failed to process {queue_name}: {e}")
+        
+        with ThreadPoolExecutor(max_workers=16) as ex:
+            list(ex.map(_process_one, queues['QueueUrls']))
                 
     except Exception as e:
         print(f"SQS Error: {e}")
 
 def scan_sns_topics():
     print(f"\n📢 SCANNING SNS TOPICS")
-    sns = boto3.client('sns', region_name=CURRENT_REGION)
+    sns = _client('sns', region_name=CURRENT_REGION)
     try:
         paginator = sns.get_paginator('list_topics')
-        for page in paginator.paginate():
-            for topic in page['Topics']:
-                topic_arn = topic['TopicArn']
+        topic_arns = [topic['TopicArn'] for page in paginator.paginate() for topic in page['Topics']]
+        
+        with ThreadPoolExecutor(max_workers=16) as ex:
+            # Attributes and subscriptions are independent calls, so both go out per topic up front
+            pending = [(topic_arn,
+                        ex.submit(sns.get_topic_attributes, TopicArn=topic_arn),
+                        ex.submit(sns.list_subscriptions_by_topic, TopicArn=topic_arn))
+                       for topic_arn in topic_arns]
+            
+            for topic_arn, attrs_f, subs_f in pending:
                 topic_name = topic_arn.split(':')[-1]
                 print(f"   ... Processing Topic: {topic_name}")
                 
                 try:
                     # Get topic attributes
-                    attrs = sns.get_topic_attributes(TopicArn=topic_arn)
+                    attrs = attrs_f.result()
                     
                     # Get subscriptions
-                    subs = sns.list_subscriptions_by_topic(TopicArn=topic_arn)
+                    subs = subs_f.result()
                     
                     config = {
                         "TopicName": topic_name,
@@ -262,7 +342,7 @@ def scan_sns_topics():
 
 def scan_load_balancers():
     print(f"\n⚖️ SCANNING LOAD BALANCERS")
-    elbv2 = boto3.client('elbv2', region_name=CURRENT_REGION)
+    elbv2 = _client('elbv2', region_name=CURRENT_REGION)
     try:
         lbs = elbv2.describe_load_balancers()
         
@@ -306,33 +386,24 @@ def scan_load_balancers():
 
 def scan_security_groups_used():
     print(f"\n🔒 SCANNING SECURITY GROUPS (Used by Services)")
-    ec2 = boto3.client('ec2', region_name=CURRENT_REGION)
-    ecs = boto3.client('ecs', region_name=CURRENT_REGION)
-    lambda_client = boto3.client('lambda', region_name=CURRENT_REGION)
-    elbv2 = boto3.client('elbv2', region_name=CURRENT_REGION)
+    ec2 = _client('ec2', region_name=CURRENT_REGION)
+    lambda_client = _client('lambda', region_name=CURRENT_REGION)
+    elbv2 = _client('elbv2', region_name=CURRENT_REGION)
     
     used_sg_ids = set()
-    sg_usage_map = {}
+    sg_usage_map = defaultdict(list)
     
     try:
         # Get SGs from ECS services (if cluster name provided)
         try:
-            clusters = ecs.list_clusters()
-            for cluster_arn in clusters.get('clusterArns', []):
-                services = ecs.list_services(cluster=cluster_arn)
-                if services.get('serviceArns'):
-                    desc_services = ecs.describe_services(
-                        cluster=cluster_arn,
-                        services=services['serviceArns']
-                    )
-                    for service in desc_services['services']:
-                        if 'networkConfiguration' in service:
-                            sgs = service['networkConfiguration'].get('awsvpcConfiguration', {}).get('securityGroups', [])
-                            for sg in sgs:
-                                used_sg_ids.add(sg)
-                                if sg not in sg_usage_map:
-                                    sg_usage_map[sg] = []
-                                sg_usage_map[sg].append(f"ECS:{service['serviceName']}")
+            for services in _get_ecs_inventory().values():
+                for service_name, entry in services.items():
+                    service = entry['service']
+                    if 'networkConfiguration' in service:
+                        sgs = service['networkConfiguration'].get('awsvpcConfiguration', {}).get('securityGroups', [])
+                        for sg in sgs:
+                            used_sg_ids.add(sg)
+                            sg_usage_map[sg].append(f"ECS:{service_name}")
         except Exception as e:
             print(f"   ⚠️ Could not scan ECS SGs: {e}")
         
@@ -344,8 +415,6 @@ def scan_security_groups_used():
                     if 'VpcConfig' in func and 'SecurityGroupIds' in func['VpcConfig']:
                         for sg in func['VpcConfig']['SecurityGroupIds']:
                             used_sg_ids.add(sg)
-                            if sg not in sg_usage_map:
-                                sg_usage_map[sg] = []
                             sg_usage_map[sg].append(f"Lambda:{func['FunctionName']}")
         except Exception as e:
             print(f"   ⚠️ Could not scan Lambda SGs: {e}")
@@ -356,8 +425,6 @@ def scan_security_groups_used():
             for lb in lbs['LoadBalancers']:
                 for sg in lb.get('SecurityGroups', []):
                     used_sg_ids.add(sg)
-                    if sg not in sg_usage_map:
-                        sg_usage_map[sg] = []
                     sg_usage_map[sg].append(f"ALB/NLB:{lb['LoadBalancerName']}")
         except Exception as e:
             print(f"   ⚠️ Could not scan LB SGs: {e}")
@@ -382,46 +449,89 @@ def scan_security_groups_used():
     except Exception as e:
         print(f"Security Groups Error: {e}")
 
+# AWS-managed policies are attached to many roles: fetch each default version / document once per run
+@functools.lru_cache(maxsize=None)
+def _policy_default_version(policy_arn):
+    return _client('iam', region_name=None).get_policy(PolicyArn=policy_arn)['Policy']['DefaultVersionId']
+
+@functools.lru_cache(maxsize=None)
+def _policy_version_doc(policy_arn, version_id):
+    return _client('iam', region_name=None).get_policy_version(PolicyArn=policy_arn, VersionId=version_id)['PolicyVersion']['Document']
+
 def scan_iam_roles_for_services():
     print(f"\n🔐 SCANNING IAM ROLES (Used by Services)")
-    iam = boto3.client('iam')
-    ecs = boto3.client('ecs', region_name=CURRENT_REGION)
-    lambda_client = boto3.client('lambda', region_name=CURRENT_REGION)
+    iam = _client('iam', region_name=None)
+    lambda_client = _client('lambda', region_name=CURRENT_REGION)
     
     used_role_arns = set()
-    role_usage_map = {}
+    role_usage_map = defaultdict(list)
+    
+    def _describe_role(role_arn):
+        role_name = role_arn.split('/')[-1]
+        print(f"   ... Processing Role: {role_name}")
+        
+        try:
+            role = iam.get_role(RoleName=role_name)
+            
+            # Get attached policies
+            attached_policies = iam.list_attached_role_policies(RoleName=role_name)
+            
+            # Get inline policies
+            inline_policies = iam.list_role_policies(RoleName=role_name)
+            inline_policy_docs = {}
+            for policy_name in inline_policies['PolicyNames']:
+                policy_doc = iam.get_role_policy(RoleName=role_name, PolicyName=policy_name)
+                inline_policy_docs[policy_name] = policy_doc['PolicyDocument']
+            
+            # Get managed policy documents
+            managed_policy_docs = []
+            for policy in attached_policies['AttachedPolicies']:
+                try:
+                    policy_arn = policy['PolicyArn']
+                    managed_policy_docs.append({
+                        "PolicyName": policy['PolicyName'],
+                        "PolicyArn": policy_arn,
+                        "Document": _policy_version_doc(policy_arn, _policy_default_version(policy_arn))
+                    })
+                except Exception as e:
+                    print(f"   ⚠️ Could not get policy {policy['PolicyName']}: {e}")
+            
+            config = {
+                "RoleName": role_name,
+                "RoleArn": role_arn,
+                "AssumeRolePolicyDocument": role['Role']['AssumeRolePolicyDocument'],
+                "AttachedManagedPolicies": attached_policies['AttachedPolicies'],
+                "InlinePolicies": inline_policy_docs,
+                "ManagedPolicyDocuments": managed_policy_docs,
+                "UsedBy": role_usage_map.get(role_arn, []),
+                "CreateDate": role['Role']['CreateDate'].isoformat() if 'CreateDate' in role['Role'] else None
+            }
+            
+            save_json("iam_roles", role_name, config)
+            
+        except Exception as e:
+            print(f"   ❌ Failed to process {role_name}: {e}")
     
     try:
         # Get roles from ECS task definitions
         try:
-            clusters = ecs.list_clusters()
-            for cluster_arn in clusters.get('clusterArns', []):
-                services = ecs.list_services(cluster=cluster_arn)
-                if services.get('serviceArns'):
-                    desc_services = ecs.describe_services(
-                        cluster=cluster_arn,
-                        services=services['serviceArns']
-                    )
-                    for service in desc_services['services']:
-                        td_arn = service['taskDefinition']
-                        td = ecs.describe_task_definition(taskDefinition=td_arn)
-                        task_def = td['taskDefinition']
-                        
-                        # Task Execution Role
-                        if 'executionRoleArn' in task_def:
-                            role_arn = task_def['executionRoleArn']
-                            used_role_arns.add(role_arn)
-                            if role_arn not in role_usage_map:
-                                role_usage_map[role_arn] = []
-                            role_usage_map[role_arn].append(f"ECS-Execution:{service['serviceName']}")
-                        
-                        # Task Role
-                        if 'taskRoleArn' in task_def:
-                            role_arn = task_def['taskRoleArn']
-                            used_role_arns.add(role_arn)
-                            if role_arn not in role_usage_map:
-                                role_usage_map[role_arn] = []
-                            role_usage_map[role_arn].append(f"ECS-Task:{service['serviceName']}")
+            for services in _get_ecs_inventory().values():
+                for service_name, entry in services.items():
+                    task_def = entry['task_def']
+                    if not task_def:
+                        continue
+                    
+                    # Task Execution Role
+                    if 'executionRoleArn' in task_def:
+                        role_arn = task_def['executionRoleArn']
+                        used_role_arns.add(role_arn)
+                        role_usage_map[role_arn].append(f"ECS-Execution:{service_name}")
+                    
+                    # Task Role
+                    if 'taskRoleArn' in task_def:
+                        role_arn = task_def['taskRoleArn']
+                        used_role_arns.add(role_arn)
+                        role_usage_map[role_arn].append(f"ECS-Task:{service_name}")
         except Exception as e:
             print(f"   ⚠️ Could not scan ECS roles: {e}")
         
@@ -432,8 +542,6 @@ def scan_iam_roles_for_services():
                 for func in page['Functions']:
                     role_arn = func['Role']
                     used_role_arns.add(role_arn)
-                    if role_arn not in role_usage_map:
-                        role_usage_map[role_arn] = []
                     role_usage_map[role_arn].append(f"Lambda:{func['FunctionName']}")
         except Exception as e:
             print(f"   ⚠️ Could not scan Lambda roles: {e}")
@@ -442,66 +550,93 @@ def scan_iam_roles_for_services():
         if used_role_arns:
             print(f"   Found {len(used_role_arns)} IAM roles in use")
             
-            for role_arn in used_role_arns:
-                role_name = role_arn.split('/')[-1]
-                print(f"   ... Processing Role: {role_name}")
-                
-                try:
-                    role = iam.get_role(RoleName=role_name)
-                    
-                    # Get attached policies
-                    attached_policies = iam.list_attached_role_policies(RoleName=role_name)
-                    
-                    # Get inline policies
-                    inline_policies = iam.list_role_policies(RoleName=role_name)
-                    inline_policy_docs = {}
-                    for policy_name in inline_policies['PolicyNames']:
-                        policy_doc = iam.get_role_policy(RoleName=role_name, PolicyName=policy_name)
-                        inline_policy_docs[policy_name] = policy_doc['PolicyDocument']
-                    
-                    # Get managed policy documents
-                    managed_policy_docs = []
-                    for policy in attached_policies['AttachedPolicies']:
-                        try:
-                            policy_arn = policy['PolicyArn']
-                            policy_detail = iam.get_policy(PolicyArn=policy_arn)
-                            default_version = policy_detail['Policy']['DefaultVersionId']
-                            policy_version = iam.get_policy_version(
-                                PolicyArn=policy_arn,
-                                VersionId=default_version
-                            )
-                            managed_policy_docs.append({
-                                "PolicyName": policy['PolicyName'],
-                                "PolicyArn": policy_arn,
-                                "Document": policy_version['PolicyVersion']['Document']
-                            })
-                        except Exception as e:
-                            print(f"   ⚠️ Could not get policy {policy['PolicyName']}: {e}")
-                    
-                    config = {
-                        "RoleName": role_name,
-                        "RoleArn": role_arn,
-                        "AssumeRolePolicyDocument": role['Role']['AssumeRolePolicyDocument'],
-                        "AttachedManagedPolicies": attached_policies['AttachedPolicies'],
-                        "InlinePolicies": inline_policy_docs,
-                        "ManagedPolicyDocuments": managed_policy_docs,
-                        "UsedBy": role_usage_map.get(role_arn, []),
-                        "CreateDate": role['Role']['CreateDate'].isoformat() if 'CreateDate' in role['Role'] else None
-                    }
-                    
-                    save_json("iam_roles", role_name, config)
-                    
-                except Exception as e:
-                    print(f"   ❌ Failed to process {role_name}: {e}")
+            with ThreadPoolExecutor(max_workers=16) as ex:
+                list(ex.map(_describe_role, used_role_arns))
         else:
             print("   No IAM roles found in use")
             
     except Exception as e:
         print(f"IAM Roles Error: {e}")
 
+def _download_one(s3, bucket, prefix, folder_path, obj):
+    """Downloads one listed object into folder_path (unless should_skip_file rejects it); returns its _index.json entry"""
+    key = obj['Key']
+    filename = key.replace(prefix, '')
+    size = obj['Size']
+    print(f"      ... Processing: {filename}")
+
+    # Check if should skip
+    should_skip, skip_reason = should_skip_file(filename, size)
+
+    file_info = {
+        "filename": filename,
+        "key": key,
+        "size": size,
+        "last_modified": obj['LastModified'].isoformat(),
+        "etag": obj['ETag'].strip('"'),
+        "downloaded": False,
+        "content_hash": None,
+        "hash_algo": None,
+        "skip_reason": skip_reason
+    }
+
+    # Content type: guessed from the extension here (no network call), replaced by get_object's header on download
+    file_info['content_type'] = mimetypes.guess_type(filename)[0] or 'unknown'
+
+    # Extract version if present
+    version = extract_version_from_filename(filename)
+    if version:
+        file_info['version_detected'] = version
+
+    if should_skip:
+        print(f"         ⏭️  Skipped: {skip_reason}")
+    else:
+        # Download the file
+        try:
+            obj_response = s3.get_object(Bucket=bucket, Key=key)
+            file_info['content_type'] = obj_response.get('ContentType', 'unknown')
+
+            # Save file to disk
+            file_path = os.path.join(folder_path, filename)
+
+            # Create subdirectories if needed
+            _ensure_dir(os.path.dirname(file_path))
+
+            # content_hash is only an equality check between dumps, so a non-cryptographic xxh3 of the raw bytes
+            # (not the ETag: multipart ETags aren't content hashes, and one algo keeps every entry comparable)
+            hasher = xxhash.xxh3_128()
+
+            # One pass over the body: each chunk is hashed and handed straight on,
+            # to disk for most files, to a buffer for JSON (parsed and pretty-printed once complete)
+            is_json = filename.endswith('.json')
+            parts = []
+            with open(file_path, 'wb') as f:
+                sink = parts.append if is_json else f.write
+                for chunk in obj_response['Body'].iter_chunks(64 * 1024):
+                    hasher.update(chunk)
+                    sink(chunk)
+                
+                if is_json:
+                    content_bytes = b"".join(parts)
+                    try:
+                        f.write(orjson.dumps(orjson.loads(content_bytes), option=orjson.OPT_INDENT_2))
+                    except:
+                        # If can't parse as JSON, save as-is
+                        f.write(content_bytes)
+            file_info['content_hash'], file_info['hash_algo'] = hasher.hexdigest(), 'xxh3_128'
+            file_info['downloaded'] = True
+
+            print(f"         ✅ Downloaded ({size} bytes)")
+
+        except Exception as e:
+            print(f"         ❌ Download failed: {e}")
+            file_info['skip_reason'] = f"download_error: {str(e)}"
+
+    return file_info
+
 def scan_s3_file_contents(config_file_path):
     print(f"\n📂 SCANNING S3 FILE CONTENTS (from config)")
-    s3 = boto3.client('s3')
+    s3 = _client('s3', region_name=None)
     
     try:
         # Load config file
@@ -510,8 +645,8 @@ def scan_s3_file_contents(config_file_path):
             print(f"   Skipping S3 file content download")
             return
         
-        with open(config_file_path, 'r') as f:
-            config = json.load(f)
+        with open(config_file_path, 'rb') as f:
+            config = orjson.loads(f.read())
         
         environment = config.get('environment', 'unknown')
         print(f"   Environment: {environment}")
@@ -540,102 +675,25 @@ def scan_s3_file_contents(config_file_path):
             }
             
             try:
-                # List all objects in the folder
+                # List all objects in the folder first (skipping folder markers)
                 paginator = s3.get_paginator('list_objects_v2')
-                for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
-                    if 'Contents' not in page:
-                        continue
-                    
-                    for obj in page['Contents']:
-                        key = obj['Key']
-                        
-                        # Skip folder markers
-                        if key.endswith('/'):
-                            continue
-                        
-                        filename = key.replace(prefix, '')
-                        if not filename:
-                            continue
-                        
-                        size = obj['Size']
-                        index_data['total_files'] += 1
-                        
-                        print(f"      ... Processing: {filename}")
-                        
-                        # Check if should skip
-                        should_skip, skip_reason = should_skip_file(filename, size)
-                        
-                        file_info = {
-                            "filename": filename,
-                            "key": key,
-                            "size": size,
-                            "last_modified": obj['LastModified'].isoformat(),
-                            "etag": obj['ETag'].strip('"'),
-                            "downloaded": False,
-                            "content_hash": None,
-                            "skip_reason": skip_reason
-                        }
-                        
-                        # Get content type
-                        try:
-                            head = s3.head_object(Bucket=bucket, Key=key)
-                            file_info['content_type'] = head.get('ContentType', 'unknown')
-                        except:
-                            file_info['content_type'] = 'unknown'
-                        
-                        # Extract version if present
-                        version = extract_version_from_filename(filename)
-                        if version:
-                            file_info['version_detected'] = version
-                        
-                        if should_skip:
-                            index_data['skipped_files'] += 1
-                            print(f"         ⏭️  Skipped: {skip_reason}")
-                        else:
-                            # Download the file
-                            try:
-                                obj_response = s3.get_object(Bucket=bucket, Key=key)
-                                content_bytes = obj_response['Body'].read()
-                                
-                                # Calculate hash
-                                file_info['content_hash'] = hashlib.md5(content_bytes).hexdigest()
-                                file_info['downloaded'] = True
-                                index_data['downloaded_files'] += 1
-                                
-                                # Save file to disk
-                                file_path = os.path.join(folder_path, filename)
-                                
-                                # Create subdirectories if needed
-                                os.makedirs(os.path.dirname(file_path), exist_ok=True)
-                                
-                                # For JSON files, parse and pretty-print
-                                if filename.endswith('.json'):
-                                    try:
-                                        content_json = json.loads(content_bytes.decode('utf-8'))
-                                        with open(file_path, 'w') as f:
-                                            json.dump(content_json, f, indent=2)
-                                    except:
-                                        # If can't parse as JSON, save as-is
-                                        with open(file_path, 'wb') as f:
-                                            f.write(content_bytes)
-                                else:
-                                    # Binary file - save as-is
-                                    with open(file_path, 'wb') as f:
-                                        f.write(content_bytes)
-                                
-                                print(f"         ✅ Downloaded ({size} bytes)")
-                                
-                            except Exception as e:
-                                print(f"         ❌ Download failed: {e}")
-                                file_info['skip_reason'] = f"download_error: {str(e)}"
-                                index_data['skipped_files'] += 1
-                        
-                        index_data['files'].append(file_info)
+                objs = [obj for page in paginator.paginate(Bucket=bucket, Prefix=prefix)
+                        for obj in page.get('Contents', [])
+                        if not obj['Key'].endswith('/') and obj['Key'].replace(prefix, '')]
+                
+                # Each object is its own RTT-bound head/get + disk write, so download them concurrently;
+                # map() keeps listing order, and the counters are tallied here on one thread
+                with ThreadPoolExecutor(max_workers=32) as ex:
+                    index_data['files'] = list(ex.map(lambda obj: _download_one(s3, bucket, prefix, folder_path, obj), objs))
+                
+                index_data['total_files'] = len(index_data['files'])
+                index_data['downloaded_files'] = sum(1 for f in index_data['files'] if f['downloaded'])
+                index_data['skipped_files'] = index_data['total_files'] - index_data['downloaded_files']
                 
                 # Save index file
                 index_path = os.path.join(folder_path, "_index.json")
-                with open(index_path, 'w') as f:
-                    json.dump(index_data, f, indent=2)
+                with open(index_path, 'wb') as f:
+                    f.write(orjson.dumps(index_data, option=orjson.OPT_INDENT_2))
                 
                 print(f"   ✅ Completed: {index_data['downloaded_files']} files downloaded, {index_data['skipped_files']} skipped")
                 
@@ -666,15 +724,14 @@ if __name__ == "__main__":
     else:
         print("⏭️  Skipping ECS scan")
     
-    # Always scan these
-    scan_s3_buckets()
-    scan_api_gateway()
-    scan_lambda_functions()
-    scan_sqs_queues()
-    scan_sns_topics()
-    scan_load_balancers()
-    scan_security_groups_used()
-    scan_iam_roles_for_services()
+    # Always scan these - independent services and network-bound, so run them side by side
+    scanners = [scan_s3_buckets, scan_api_gateway, scan_lambda_functions, scan_sqs_queues,
+                scan_sns_topics, scan_load_balancers, scan_security_groups_used, scan_iam_roles_for_services]
+    with ThreadPoolExecutor(max_workers=8) as ex:
+        futures = {ex.submit(fn): fn.__name__ for fn in scanners}
+        for fut in as_completed(futures):
+            try: fut.result()
+            except Exception as e: print(f"❌ {futures[fut]} crashed: {e}")
     
     # S3 file contents (if config provided)
     if s3_config_path:
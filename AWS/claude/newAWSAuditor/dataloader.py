@@ -2,9 +2,132 @@
 # UPDATED DATA LOADER
 # Replace the existing load_data_recursively function with this
 # ==========================================
+import functools
+import glob
+import hashlib
+import mmap
+import msgpack
+import orjson
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+# Dump folder name -> data bucket, in the order the old if/elif chain checked them (first match wins)
+ROUTE = {
+    "task_definitions": "ecs_td",
+    "s3_buckets": "s3",
+    "api_gateway": "api_gw",
+    "lambda_functions": "lambda",
+    "sqs_queues": "sqs",
+    "sns_topics": "sns",
+    "load_balancers": "lb",
+    "security_groups": "sg",
+    "iam_roles": "iam",
+}
+
+def _scan_json_files(path):
+    """Yields (full_path, file, bucket, size, mtime_ns) for every routable dump JSON under path, recursing with os.scandir
+    (DirEntry already knows dir vs file from readdir; the one stat per kept file feeds the cache keys)"""
+    try:
+        it = os.scandir(path)
+    except OSError:
+        return  # unreadable folder: skipped, as os.walk did
+    # Route once per folder from its path components; files in unrouted folders are never opened
+    parts = set(path.split(os.sep))
+    bucket = next((b for token, b in ROUTE.items() if token in parts), None)
+    with it:
+        for entry in it:
+            if entry.is_dir(follow_symlinks=False):
+                yield from _scan_json_files(entry.path)
+                continue
+            # Name-only rejects first; entry.path is already joined
+            file = entry.name
+            if not bucket or not file.endswith(".json"):
+                continue
+            if file == "_index.json" or file == "metadata.json" or file.startswith("metadata_"):
+                continue
+            if entry.is_file(follow_symlinks=False):
+                try:
+                    st_ = entry.stat(follow_symlinks=False)
+                except OSError:
+                    continue  # vanished mid-walk
+                yield entry.path, file, bucket, st_.st_size, st_.st_mtime_ns
+
+def _intern(o):
+    """Rebuilds parsed JSON with every str interned: the same ARN / action / region repeated across files is stored once"""
+    if type(o) is str:
+        return sys.intern(o)
+    if type(o) is dict:
+        return {sys.intern(k) if type(k) is str else k: _intern(v) for k, v in o.items()}
+    if type(o) is list:
+        return [_intern(x) for x in o]
+    return o
+
+@st.cache_resource(show_spinner=False)
+def _parsed_dump_files():
+    """Process-wide {path: (size, mtime_ns, parsed + interned JSON)}; survives reruns, a stale stamp means the file is re-read"""
+    return {}
+
+def _load_one(parsed, item):
+    """Parses one dump file on a worker thread; returns (bucket, name, content), or None to skip it.
+    Unchanged files come from parsed, so a partly re-collected dump only re-parses the files that changed"""
+    full_path, file, bucket, size, mtime_ns = item
+    try:
+        hit = parsed.get(full_path)
+        if hit is not None and hit[0] == size and hit[1] == mtime_ns:
+            content = hit[2]
+        else:
+            with open(full_path, 'rb') as f:
+                content = _intern(orjson.loads(f.read()))
+            parsed[full_path] = (size, mtime_ns, content)
+        
+        # ECS Task Definitions: only keep files that actually look like one
+        if bucket == "ecs_td" and 'containerDefinitions' not in content and 'taskDefinition' not in content:
+            return None
+        
+        return bucket, file.replace('.json', ''), content
+    except Exception as e:
+        return None  # Skip files that can't be loaded
+
+def _dump_signature(files):
+    h = hashlib.blake2b(digest_size=16)
+    for full_path, file, bucket, size, mtime_ns in files:
+        h.update(f"{full_path}:{mtime_ns}:{size}\n".encode())
+    return h.hexdigest()
+
+def _read_dump_cache(cache_path):
+    try:
+        with open(cache_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return _intern(msgpack.unpackb(mm))
+    except Exception as e:
+        return None  # no cache yet (or unreadable): fall back to parsing
+
+def _write_dump_cache(cache_path, data):
+    try:
+        tmp_path = cache_path + ".tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(msgpack.packb(data, use_bin_type=True))
+        os.replace(tmp_path, cache_path)
+        # Older signatures are stale now
+        for old in glob.glob(os.path.join(glob.escape(os.path.dirname(cache_path)), ".auditor_cache_*.msgpack")):
+            if old != cache_path:
+                os.remove(old)
+    except Exception as e:
+        pass  # read-only dump folder etc.: just no cache
+
+# Latest file signature per dump folder, refreshed by every load_data_recursively call (i.e. every rerun);
+# other caches key on it so a re-collected dump invalidates them too
+DUMP_SIGNATURES = {}
 
-@st.cache_data
 def load_data_recursively(folder_path):
+    """Loads a dump folder; the (path, mtime, size) signature of its files is part of the cache key,
+    so a dump re-collected into the same folder is re-read, even from Streamlit's disk cache"""
+    files = list(_scan_json_files(folder_path)) if folder_path and os.path.exists(folder_path) else []
+    signature = DUMP_SIGNATURES[folder_path] = _dump_signature(files)
+    return _load_data_cached(folder_path, signature, files)
+
+# Pickled to disk by Streamlit too, so a fresh server process / worker skips even the sidecar read
+@st.cache_data(persist="disk", show_spinner=False, max_entries=8)
+def _load_data_cached(folder_path, signature, _files):
     data = {
         "ecs_td": {}, 
         "s3": {}, 
@@ -20,54 +143,30 @@ def load_data_recursively(folder_path):
     if not folder_path or not os.path.exists(folder_path):
         return data
     
-    for root, dirs, files in os.walk(folder_path):
-        for file in files:
-            if file.endswith(".json") and not file.startswith("metadata") and file != "_index.json":
-                full_path = os.path.join(root, file)
+    # Sidecar cache of the parsed result, named after a (path, mtime, size) signature of every routed file:
+    # a cold start with an unchanged dump is one msgpack decode instead of re-parsing every JSON
+    cache_path = os.path.join(folder_path, f".auditor_cache_{signature}.msgpack")
+    cached = _read_dump_cache(cache_path)
+    if cached is not None:
+        return cached
+    
+    with ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 4)) as executor:
+        # Everything but API Gateway is read + parsed on the pool (orjson releases the GIL while parsing)
+        # The parse cache is fetched here on the script thread; workers only read/write the plain dict
+        loaded = executor.map(functools.partial(_load_one, _parsed_dump_files()), [item for item in _files if item[2] != "api_gw"])
+        
+        # API Gateway (largest files) meanwhile on this thread: orjson parse, cached per (path, mtime) across reruns
+        for full_path, file, bucket, size, mtime_ns in _files:
+            if bucket == "api_gw":
                 try:
-                    with open(full_path, 'r') as f:
-                        content = json.load(f)
-                    name = file.replace('.json', '')
-                    parent = os.path.basename(root)
-                    
-                    # ECS Task Definitions
-                    if "task_definitions" in root or "task_definitions" in parent:
-                        if 'containerDefinitions' in content or 'taskDefinition' in content:
-                            data["ecs_td"][name] = content
-                    
-                    # S3 Buckets (policies/config)
-                    elif "s3_buckets" in root:
-                        data["s3"][name] = content
-                    
-                    # API Gateway
-                    elif "api_gateway" in root:
-                        data["api_gw"][name] = content
-                    
-                    # Lambda Functions
-                    elif "lambda_functions" in root:
-                        data["lambda"][name] = content
-                    
-                    # SQS Queues
-                    elif "sqs_queues" in root:
-                        data["sqs"][name] = content
-                    
-                    # SNS Topics
-                    elif "sns_topics" in root:
-                        data["sns"][name] = content
-                    
-                    # Load Balancers
-                    elif "load_balancers" in root:
-                        data["lb"][name] = content
-                    
-                    # Security Groups
-                    elif "security_groups" in root:
-                        data["sg"][name] = content
-                    
-                    # IAM Roles
-                    elif "iam_roles" in root:
-                        data["iam"][name] = content
-                
+                    data["api_gw"][file.replace('.json', '')] = _load_api_json(full_path, mtime_ns)
                 except Exception as e:
                     pass  # Skip files that can't be loaded
+        
+        for result in loaded:
+            if result:
+                bucket, name, content = result
+                data[bucket][name] = content
     
+    _write_dump_cache(cache_path, data)
     return data
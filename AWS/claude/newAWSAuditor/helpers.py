@@ -4,12 +4,22 @@
 # ==========================================
 
 import hashlib
+import orjson
 import re
+from collections import defaultdict
+
+# Status badge templates (styled by the dashboard's badge-* CSS classes)
+BADGE_CRIT = "<span class='badge-crit'>{}</span>"
+BADGE_WARN = "<span class='badge-warn'>{}</span>"
+BADGE_PASS = "<span class='badge-pass'>{}</span>"
 
 # ==========================================
 # LAMBDA FUNCTIONS HELPERS
 # ==========================================
 
+# Env var names that normally differ per environment (endpoints, ARNs, ...); one C-level scan per key
+_CONFIG_SUFFIX_RE = re.compile(r'_(?:HOST|URL|URI|ARN|DB|BUCKET)')
+
 def parse_lambda_env(lambda_config):
     """Parse Lambda environment variables"""
     vars_map = {}
@@ -30,9 +40,9 @@ def render_lambda_dashboard(src_lambda, tgt_lambda):
     runtime_src = src_lambda.get('Runtime', 'N/A')
     runtime_tgt = tgt_lambda.get('Runtime', 'N/A')
     if runtime_src == runtime_tgt:
-        col1.markdown(f"**Runtime** <span class='badge-pass'>MATCH</span><br>`{runtime_src}`", unsafe_allow_html=True)
+        col1.markdown(f"**Runtime** {BADGE_PASS.format('MATCH')}<br>`{runtime_src}`", unsafe_allow_html=True)
     else:
-        col1.markdown(f"**Runtime** <span class='badge-warn'>DRIFT</span><br>Src: `{runtime_src}`<br>Tgt: `{runtime_tgt}`", unsafe_allow_html=True)
+        col1.markdown(f"**Runtime** {BADGE_WARN.format('DRIFT')}<br>Src: `{runtime_src}`<br>Tgt: `{runtime_tgt}`", unsafe_allow_html=True)
         report["Warnings"].append(f"Runtime mismatch: {runtime_src} vs {runtime_tgt}")
     
     # Timeout
@@ -98,7 +108,9 @@ def render_lambda_dashboard(src_lambda, tgt_lambda):
     map_src = parse_lambda_env(src_lambda)
     map_tgt = parse_lambda_env(tgt_lambda)
     all_keys = sorted(set(map_src.keys()) | set(map_tgt.keys()))
-    rows = []
+    is_config_key = _CONFIG_SUFFIX_RE.search
+    # One list per column (not a dict per row), so the DataFrame is built column-wise in one go
+    _var, _status, _src, _tgt, _cat = [], [], [], [], []
     
     for k in all_keys:
         val_src = map_src.get(k, {}).get('value', '-')
@@ -110,17 +122,17 @@ def render_lambda_dashboard(src_lambda, tgt_lambda):
         elif val_tgt == '-':
             status = "❌ Missing in Target"; category = "Critical"
         elif val_src != val_tgt:
-            if any(x in k for x in ['_HOST', '_URL', '_URI', '_ARN', '_DB', '_BUCKET']):
+            if is_config_key(k):
                 status = "🔄 Config Diff"; category = "Expected"
             else:
                 status = "⚠️ Value Drift"; category = "Warnings"
         
         if category != "Expected":
-            rows.append({"Variable": k, "Status": status, "Source Value": val_src, "Target Value": val_tgt, "Category": category})
-            if category != "Expected":
-                report[category].append(f"{k}: {status}")
+            _var.append(k); _status.append(status); _src.append(val_src); _tgt.append(val_tgt); _cat.append(category)
+            report[category].append(f"{k}: {status}")
     
-    df = pd.DataFrame(rows)
+    df = pd.DataFrame({"Variable": _var, "Status": _status, "Source Value": _src, "Target Value": _tgt,
+                       "Category": pd.Categorical(_cat, categories=["Critical", "Warnings", "Expected"])}, copy=False)
     if not df.empty:
         crit = df[df['Category'] == "Critical"]
         warn = df[df['Category'] == "Warnings"]
@@ -170,15 +182,15 @@ def render_sqs_dashboard(src_queue, tgt_queue):
     
     if dlq_src and not dlq_tgt:
         st.error("🔴 Dead Letter Queue: Configured in Source but MISSING in Target")
-        col3.markdown("<span class='badge-crit'>NO DLQ</span>", unsafe_allow_html=True)
+        col3.markdown(BADGE_CRIT.format("NO DLQ"), unsafe_allow_html=True)
         report["Critical"].append("DLQ not configured")
     elif not dlq_src and not dlq_tgt:
         st.warning("⚠️ Dead Letter Queue: Not configured in either environment")
-        col3.markdown("<span class='badge-warn'>NO DLQ</span>", unsafe_allow_html=True)
+        col3.markdown(BADGE_WARN.format("NO DLQ"), unsafe_allow_html=True)
         report["Warnings"].append("No DLQ configured")
     else:
         st.success("✅ Dead Letter Queue: Configured")
-        col3.markdown("<span class='badge-pass'>DLQ ✓</span>", unsafe_allow_html=True)
+        col3.markdown(BADGE_PASS.format("DLQ ✓"), unsafe_allow_html=True)
     
     # Encryption
     kms_src = src_queue.get('KmsMasterKeyId')
@@ -234,6 +246,9 @@ def render_sns_dashboard(src_topic, tgt_topic):
 # LOAD BALANCER HELPERS
 # ==========================================
 
+# One resource card (border colour, bold title, body), on a single line so a batch of them joins into one HTML block
+_CARD_HTML = "<div class='resource-card' style='border-left: 5px solid %s;'><b>%s</b><br>%s</div>"
+
 def render_load_balancer_dashboard(src_lb, tgt_lb):
     """Compare Load Balancer configurations"""
     report = {"Critical": [], "Warnings": [], "Info": []}
@@ -249,13 +264,13 @@ def render_load_balancer_dashboard(src_lb, tgt_lb):
     sgs_tgt = tgt_lb.get('SecurityGroups', [])
     
     if len(sgs_src) > 0 and len(sgs_tgt) == 0:
-        col3.markdown("<span class='badge-crit'>NO SGs</span>", unsafe_allow_html=True)
+        col3.markdown(BADGE_CRIT.format("NO SGs"), unsafe_allow_html=True)
         report["Critical"].append("No security groups attached to target LB")
     elif len(sgs_src) != len(sgs_tgt):
-        col3.markdown(f"<span class='badge-warn'>SG Count: {len(sgs_tgt)}</span>", unsafe_allow_html=True)
+        col3.markdown(BADGE_WARN.format(f"SG Count: {len(sgs_tgt)}"), unsafe_allow_html=True)
         report["Warnings"].append(f"Security group count mismatch: {len(sgs_src)} vs {len(sgs_tgt)}")
     else:
-        col3.markdown(f"<span class='badge-pass'>SGs: {len(sgs_tgt)}</span>", unsafe_allow_html=True)
+        col3.markdown(BADGE_PASS.format(f"SGs: {len(sgs_tgt)}"), unsafe_allow_html=True)
     
     st.divider()
     
@@ -265,14 +280,18 @@ def render_load_balancer_dashboard(src_lb, tgt_lb):
     tgs_src = src_lb.get('TargetGroups', [])
     tgs_tgt = tgt_lb.get('TargetGroups', [])
     
+    tgt_index = {tg['TargetGroupName']: tg for tg in tgs_tgt}
+    
+    # Every target group card goes out in one st.markdown call rather than one call per group
+    cards = []
     for tg_src in tgs_src:
         tg_name = tg_src['TargetGroupName']
         
         # Find matching target group
-        tg_tgt = next((tg for tg in tgs_tgt if tg['TargetGroupName'] == tg_name), None)
+        tg_tgt = tgt_index.get(tg_name)
         
         if not tg_tgt:
-            st.error(f"❌ Target Group '{tg_name}' missing in target")
+            cards.append(_CARD_HTML % ('#c62828', f"❌ Target Group '{tg_name}' missing in target", ""))
             report["Critical"].append(f"Target group {tg_name} missing")
             continue
         
@@ -300,14 +319,12 @@ def render_load_balancer_dashboard(src_lb, tgt_lb):
             report["Warnings"].append(f"{tg_name}: Health check threshold differs")
         
         if issues:
-            st.markdown(f"""
-            <div class='resource-card' style='border-left: 5px solid #ffa000;'>
-                <b>⚠️ {tg_name}</b><br>
-                {' • '.join(issues)}
-            </div>
-            """, unsafe_allow_html=True)
+            cards.append(_CARD_HTML % ('#ffa000', f"⚠️ {tg_name}", ' • '.join(issues)))
         else:
-            st.success(f"✅ {tg_name}: Health check settings match")
+            cards.append(_CARD_HTML % ('#4caf50', f"✅ {tg_name}: Health check settings match", ""))
+    
+    if cards:
+        st.markdown("\n".join(cards), unsafe_allow_html=True)
     
     return report
 
@@ -316,6 +333,16 @@ def render_load_balancer_dashboard(src_lb, tgt_lb):
 # SECURITY GROUPS HELPERS
 # ==========================================
 
+def _rule_key(rule):
+    """Hashable, order-independent identity of one SG rule: protocol, port range and every source it allows"""
+    return (
+        rule.get('IpProtocol'),
+        rule.get('FromPort'),
+        rule.get('ToPort'),
+        frozenset([ip['CidrIp'] for ip in rule.get('IpRanges', [])] + [ip['CidrIpv6'] for ip in rule.get('Ipv6Ranges', [])]),
+        frozenset([g['GroupId'] for g in rule.get('UserIdGroupPairs', [])] + [p['PrefixListId'] for p in rule.get('PrefixListIds', [])]),
+    )
+
 def render_security_group_dashboard(src_sg, tgt_sg):
     """Compare Security Group configurations"""
     report = {"Critical": [], "Warnings": [], "Info": []}
@@ -361,29 +388,31 @@ def render_security_group_dashboard(src_sg, tgt_sg):
     rules_src = src_sg.get('IpPermissions', [])
     rules_tgt = tgt_sg.get('IpPermissions', [])
     
-    # Simple comparison - count
-    if len(rules_src) != len(rules_tgt):
-        st.warning(f"⚠️ Rule count mismatch: Source has {len(rules_src)}, Target has {len(rules_tgt)}")
-        report["Warnings"].append(f"Inbound rule count: {len(rules_src)} vs {len(rules_tgt)}")
-    else:
-        st.success(f"✅ Both have {len(rules_src)} inbound rules")
+    # Compare actual rules (canonical, order-independent key per rule), not just the counts
+    src_by_key = {_rule_key(r): r for r in rules_src}
+    tgt_by_key = {_rule_key(r): r for r in rules_tgt}
+    missing = src_by_key.keys() - tgt_by_key.keys()
+    extra = tgt_by_key.keys() - src_by_key.keys()
     
-    # Show rules side by side
-    col_src, col_tgt = st.columns(2)
-    
-    with col_src:
-        st.markdown("**Source Rules:**")
-        for rule in rules_src:
-            port = rule.get('FromPort', 'All')
-            protocol = rule.get('IpProtocol', 'All')
-            st.code(f"Port {port} ({protocol})")
-    
-    with col_tgt:
-        st.markdown("**Target Rules:**")
-        for rule in rules_tgt:
-            port = rule.get('FromPort', 'All')
-            protocol = rule.get('IpProtocol', 'All')
-            st.code(f"Port {port} ({protocol})")
+    if missing or extra:
+        st.warning(f"⚠️ Inbound rules differ: {len(missing)} only in Source, {len(extra)} only in Target")
+        report["Warnings"].append(f"Inbound rules: {len(missing)} missing in target, {len(extra)} extra in target")
+    else:
+        st.success(f"✅ Both have the same {len(src_by_key)} inbound rules")
+    
+    # All rules in one table instead of an st.code block per rule
+    _proto, _from, _to, _sources, _status = [], [], [], [], []
+    for key in sorted(src_by_key.keys() | tgt_by_key.keys(), key=lambda k: tuple(map(str, k[:3]))):
+        protocol, from_port, to_port, cidrs, groups = key
+        _proto.append('All' if protocol in (None, '-1') else protocol)
+        _from.append('All' if from_port is None else str(from_port))
+        _to.append('All' if to_port is None else str(to_port))
+        _sources.append(", ".join(sorted(cidrs) + sorted(groups)))
+        _status.append("❌ Source only" if key in missing else "➕ Target only" if key in extra else "✅ Both")
+    
+    if _status:
+        st.dataframe(pd.DataFrame({"Protocol": _proto, "From Port": _from, "To Port": _to, "Sources": _sources, "Status": _status}),
+                     use_container_width=True, hide_index=True)
     
     return report
 
@@ -392,36 +421,42 @@ def render_security_group_dashboard(src_sg, tgt_sg):
 # IAM ROLES HELPERS
 # ==========================================
 
+def _iter_policy_docs(role_config):
+    """Inline policy documents, then managed ones"""
+    yield from role_config.get('InlinePolicies', {}).values()
+    for policy in role_config.get('ManagedPolicyDocuments', []):
+        yield policy.get('Document', {})
+
 def extract_permissions_from_policies(role_config):
     """Extract all permissions from a role's policies"""
-    permissions = {}
-    
-    # From inline policies
-    for policy_name, policy_doc in role_config.get('InlinePolicies', {}).items():
-        for statement in policy_doc.get('Statement', []):
-            actions = statement.get('Action', [])
+    # Gather every action into one set first (set.update runs in C): policies overlap heavily, so only the
+    # unique actions get classified below
+    all_actions = set()
+    for policy_doc in _iter_policy_docs(role_config):
+        for statement in policy_doc.get('Statement', ()):
+            actions = statement.get('Action', ())
             if isinstance(actions, str):
-                actions = [actions]
-            for action in actions:
-                service = action.split(':')[0] if ':' in action else 'unknown'
-                if service not in permissions:
-                    permissions[service] = set()
-                permissions[service].add(action)
-    
-    # From managed policies
-    for policy in role_config.get('ManagedPolicyDocuments', []):
-        for statement in policy.get('Document', {}).get('Statement', []):
-            actions = statement.get('Action', [])
-            if isinstance(actions, str):
-                actions = [actions]
-            for action in actions:
-                service = action.split(':')[0] if ':' in action else 'unknown'
-                if service not in permissions:
-                    permissions[service] = set()
-                permissions[service].add(action)
+                all_actions.add(actions)
+            else:
+                all_actions.update(actions)
+    
+    permissions = defaultdict(set)
+    for action in all_actions:
+        service, sep, _ = action.partition(':')
+        permissions[service if sep else 'unknown'].add(action)
     
     return permissions
 
+def _policy_digest(role):
+    """Content hash of a role's inline + managed policy documents (the only input to its permissions)"""
+    policies = {"inline": role.get('InlinePolicies'), "mgd": role.get('ManagedPolicyDocuments')}
+    return hashlib.blake2b(orjson.dumps(policies, default=str, option=orjson.OPT_SORT_KEYS)).hexdigest()
+
+@st.cache_data(show_spinner=False)
+def _perms_of(policy_hash, _role):
+    """{service: frozenset(actions)} for one role; policy_hash (see _policy_digest) stands in for the unhashed role dict"""
+    return {service: frozenset(actions) for service, actions in extract_permissions_from_policies(_role).items()}
+
 def render_iam_role_dashboard(src_role, tgt_role):
     """Compare IAM Role configurations"""
     report = {"Critical": [], "Warnings": [], "Info": []}
@@ -440,37 +475,39 @@ def render_iam_role_dashboard(src_role, tgt_role):
     
     st.divider()
     
-    # Extract permissions
-    perms_src = extract_permissions_from_policies(src_role)
-    perms_tgt = extract_permissions_from_policies(tgt_role)
-    
     st.markdown("**Permission Analysis:**")
     
+    # Byte-identical policies (the usual case after a promotion) can't differ in permissions: skip extraction
+    hash_src = _policy_digest(src_role)
+    hash_tgt = _policy_digest(tgt_role)
+    if hash_src == hash_tgt:
+        st.success("✅ All policies identical")
+        return report
+    
+    # Extract permissions
+    perms_src = _perms_of(hash_src, src_role)
+    perms_tgt = _perms_of(hash_tgt, tgt_role)
+    
     all_services = sorted(set(perms_src.keys()) | set(perms_tgt.keys()))
     
+    # Every service card goes out in one st.markdown call rather than one call per service
+    cards = []
     for service in all_services:
-        actions_src = perms_src.get(service, set())
-        actions_tgt = perms_tgt.get(service, set())
+        actions_src = perms_src.get(service, frozenset())
+        actions_tgt = perms_tgt.get(service, frozenset())
         
         missing_in_tgt = actions_src - actions_tgt
         extra_in_tgt = actions_tgt - actions_src
         
         if missing_in_tgt:
-            st.markdown(f"""
-            <div class='resource-card' style='border-left: 5px solid #c62828;'>
-                <b>❌ {service.upper()}: Missing Actions in Target</b><br>
-                {', '.join(sorted(missing_in_tgt))}
-            </div>
-            """, unsafe_allow_html=True)
+            cards.append(_CARD_HTML % ('#c62828', f"❌ {service.upper()}: Missing Actions in Target", ', '.join(sorted(missing_in_tgt))))
             report["Critical"].append(f"{service}: Missing {len(missing_in_tgt)} actions")
         elif extra_in_tgt:
-            st.markdown(f"""
-            <div class='resource-card' style='border-left: 5px solid #4caf50;'>
-                <b>✅ {service.upper()}: All actions present</b><br>
-                <small>({len(actions_tgt)} actions)</small>
-            </div>
-            """, unsafe_allow_html=True)
+            cards.append(_CARD_HTML % ('#4caf50', f"✅ {service.upper()}: All actions present", f"<small>({len(actions_tgt)} actions)</small>"))
         else:
-            st.success(f"✅ {service.upper()}: Permissions match ({len(actions_src)} actions)")
+            cards.append(_CARD_HTML % ('#4caf50', f"✅ {service.upper()}: Permissions match", f"<small>({len(actions_src)} actions)</small>"))
+    
+    if cards:
+        st.markdown("\n".join(cards), unsafe_allow_html=True)
     
     return report
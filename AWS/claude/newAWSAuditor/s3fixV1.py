@@ -45,6 +45,37 @@ def scan_api_gateway():
 # Replace the entire Tab 9 section in your dashboard
 # ==========================================
 
+def _subdirs(p):
+    """Subfolder names of p (DirEntry.is_dir() comes from readdir, no stat per entry); [] if p isn't a folder"""
+    return [e.name for e in os.scandir(p) if e.is_dir(follow_symlinks=False)] if p and os.path.isdir(p) else []
+
+def _index_stamps(base, folders):
+    """((folder, _index.json mtime_ns or None), ...): one stat per folder, so a rewritten or newly written index changes the key"""
+    stamps = []
+    for folder in folders:
+        try:
+            stamps.append((folder, os.stat(os.path.join(base, folder, "_index.json")).st_mtime_ns))
+        except OSError:
+            stamps.append((folder, None))  # not written yet (collection still running)
+    return tuple(stamps)
+
+@st.cache_data(persist="disk", show_spinner=False)
+def _load_indices(base, stamps):
+    """{folder: parsed _index.json (None if missing)} for every folder under base, read side by side.
+    Keyed on each index's own mtime (see _index_stamps): writing an index doesn't touch base's mtime"""
+    def _load_index(stamp):
+        folder, mtime_ns = stamp
+        if mtime_ns is None:
+            return None
+        try:
+            with open(os.path.join(base, folder, "_index.json"), 'rb') as f:
+                return orjson.loads(f.read())
+        except Exception:
+            return None
+    
+    with ThreadPoolExecutor(max_workers=8) as ex:
+        return dict(zip([folder for folder, _ in stamps], ex.map(_load_index, stamps)))
+
 # TAB 9: S3 Files (FIXED)
 with tab9:
     st.markdown("### 📄 S3 Configuration Files Comparison")
@@ -54,14 +85,11 @@ with tab9:
     tgt_s3_base = os.path.join(path_b, "s3_file_contents") if path_b else None
     
     # Get subfolders within s3_file_contents
-    src_folders = []
-    tgt_folders = []
-    
-    if src_s3_base and os.path.exists(src_s3_base):
-        src_folders = [f for f in os.listdir(src_s3_base) if os.path.isdir(os.path.join(src_s3_base, f))]
+    src_folders = _subdirs(src_s3_base)
+    tgt_folders = _subdirs(tgt_s3_base)
     
-    if tgt_s3_base and os.path.exists(tgt_s3_base):
-        tgt_folders = [f for f in os.listdir(tgt_s3_base) if os.path.isdir(os.path.join(tgt_s3_base, f))]
+    src_indices = _load_indices(src_s3_base, _index_stamps(src_s3_base, src_folders)) if src_folders else {}
+    tgt_indices = _load_indices(tgt_s3_base, _index_stamps(tgt_s3_base, tgt_folders)) if tgt_folders else {}
     
     if not src_folders:
         st.info("No S3 file contents found in source dump. Run collector with --s3-files-config option.")
@@ -74,10 +102,8 @@ with tab9:
             st.markdown("**Source Environment**")
             sel_src_folder = st.selectbox("Select Folder", src_folders, key="s3files_src")
             if sel_src_folder:
-                src_index_path = os.path.join(src_s3_base, sel_src_folder, "_index.json")
-                if os.path.exists(src_index_path):
-                    with open(src_index_path, 'r') as f:
-                        src_idx = json.load(f)
+                src_idx = src_indices.get(sel_src_folder)
+                if src_idx is not None:
                     st.caption(f"📦 Bucket: {src_idx.get('bucket', 'N/A')}")
                     st.caption(f"📁 Prefix: {src_idx.get('prefix', 'N/A')}")
                     st.caption(f"📊 Files: {src_idx.get('total_files', 0)} total, {src_idx.get('downloaded_files', 0)} downloaded")
@@ -92,10 +118,8 @@ with tab9:
                 idx = 0
             sel_tgt_folder = st.selectbox("Select Folder", tgt_folders, index=idx, key="s3files_tgt")
             if sel_tgt_folder:
-                tgt_index_path = os.path.join(tgt_s3_base, sel_tgt_folder, "_index.json")
-                if os.path.exists(tgt_index_path):
-                    with open(tgt_index_path, 'r') as f:
-                        tgt_idx = json.load(f)
+                tgt_idx = tgt_indices.get(sel_tgt_folder)
+                if tgt_idx is not None:
                     st.caption(f"📦 Bucket: {tgt_idx.get('bucket', 'N/A')}")
                     st.caption(f"📁 Prefix: {tgt_idx.get('prefix', 'N/A')}")
                     st.caption(f"📊 Files: {tgt_idx.get('total_files', 0)} total, {tgt_idx.get('downloaded_files', 0)} downloaded")
@@ -135,3 +159,5 @@ with tab9:
 # ==========================================
 
 import os  # Make sure this is imported at the top
+import orjson
+from concurrent.futures import ThreadPoolExecutor
@@ -2,10 +2,25 @@
 # S3 FILES COMPARISON HELPERS
 # Add these after the IAM helpers
 # ==========================================
+import orjson
+import re
+from rapidfuzz import process, fuzz
 
-def find_matching_file_fuzzy(source_filename, target_files_dict, has_version=False):
+# Version suffix (_v1.2.3 / _1.2.3), compiled once: re.sub with a str pattern goes through re's cache every call
+_VER_RE = re.compile(r'_v?\d+\.\d+\.\d+')
+
+def build_stripped_index(target_files_dict):
+    """{version-stripped filename: filename} for the targets; first file wins, like the old linear scan"""
+    stripped_index = {}
+    strip_version = _VER_RE.sub
+    for target_file in target_files_dict:
+        stripped_index.setdefault(strip_version('', target_file), target_file)
+    return stripped_index
+
+def find_matching_file_fuzzy(source_filename, target_files_dict, stripped_index, has_version=False):
     """
     Fuzzy match files, handling version patterns
+    stripped_index comes from build_stripped_index(target_files_dict)
     Returns: (matched_filename, match_type) or (None, None)
     """
     if not has_version:
@@ -14,66 +29,86 @@ def find_matching_file_fuzzy(source_filename, target_files_dict, has_version=Fal
             return source_filename, "exact"
         return None, None
     
-    # Extract base name (remove version pattern)
-    base_src = re.sub(r'_v?\d+\.\d+\.\d+', '', source_filename)
+    # Same base name once the version pattern is removed
+    target_file = stripped_index.get(_VER_RE.sub('', source_filename))
+    if target_file is not None:
+        return target_file, "version_pattern"
     
-    # Find files matching the pattern
-    for target_file in target_files_dict.keys():
-        base_tgt = re.sub(r'_v?\d+\.\d+\.\d+', '', target_file)
-        if base_src == base_tgt:
-            return target_file, "version_pattern"
-    
-    # Fallback to similarity
-    from difflib import get_close_matches
-    matches = get_close_matches(source_filename, target_files_dict.keys(), n=1, cutoff=0.8)
-    if matches:
-        return matches[0], "fuzzy"
+    # Fallback to similarity (fuzz.ratio is difflib's ratio on a 0-100 scale, scored in C++)
+    match = process.extractOne(source_filename, target_files_dict.keys(), scorer=fuzz.ratio, score_cutoff=80)
+    if match is not None:
+        return match[0], "fuzzy"
     
     return None, None
 
 
 def compare_json_deep(src_json, tgt_json, path=""):
-    """Deep comparison of two JSON objects"""
+    """Deep comparison of two JSON objects (walks nested dicts with an explicit stack into one shared result)"""
     diffs = {
         "missing": [],
         "extra": [],
         "changed": []
     }
+    missing = diffs["missing"]
+    extra = diffs["extra"]
+    changed = diffs["changed"]
     
-    # Keys in source but not target
-    for key in src_json:
-        if key not in tgt_json:
-            full_path = f"{path}.{key}" if path else key
-            diffs["missing"].append(full_path)
-    
-    # Keys in target but not source
-    for key in tgt_json:
-        if key not in src_json:
-            full_path = f"{path}.{key}" if path else key
-            diffs["extra"].append(full_path)
-    
-    # Compare values for common keys
-    for key in src_json:
-        if key in tgt_json:
-            val_src = src_json[key]
-            val_tgt = tgt_json[key]
-            full_path = f"{path}.{key}" if path else key
-            
-            if isinstance(val_src, dict) and isinstance(val_tgt, dict):
-                nested = compare_json_deep(val_src, val_tgt, full_path)
-                diffs["missing"].extend(nested["missing"])
-                diffs["extra"].extend(nested["extra"])
-                diffs["changed"].extend(nested["changed"])
-            elif val_src != val_tgt:
-                diffs["changed"].append({
-                    "key": full_path,
+    stack = [(src_json, tgt_json, path)]
+    while stack:
+        src, tgt, path = stack.pop()
+        nested = []
+        
+        # Key classification as set algebra on the dict views (C loops); sorted so reruns list diffs in the same order
+        src_keys, tgt_keys = src.keys(), tgt.keys()
+        
+        # Keys in source but not target
+        for key in sorted(src_keys - tgt_keys):
+            missing.append(f"{path}.{key}" if path else key)
+        
+        # Keys in target but not source
+        for key in sorted(tgt_keys - src_keys):
+            extra.append(f"{path}.{key}" if path else key)
+        
+        # Compare values for common keys; nested dicts are queued instead of recursed into
+        for key in sorted(src_keys & tgt_keys):
+            val_src = src[key]
+            val_tgt = tgt[key]
+            # Cheap checks first: same object, then differing types (always a change), before the deep !=
+            if val_src is val_tgt:
+                continue
+            type_src = type(val_src)
+            if type_src is dict and type(val_tgt) is dict:
+                nested.append((val_src, val_tgt, f"{path}.{key}" if path else key))
+            elif type_src is not type(val_tgt) or val_src != val_tgt:
+                changed.append({
+                    "key": f"{path}.{key}" if path else key,
                     "source": val_src,
                     "target": val_tgt
                 })
+        
+        # Reversed so they pop in key order
+        stack.extend(reversed(nested))
     
     return diffs
 
 
+# Identical-file card; missing files use the shared _CARD_HTML
+_IDENTICAL_CARD_HTML = "<div class='resource-card'><b>✅ %s</b><br>Size: %s bytes | Hash: %s...</div>"
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def _load_json_cached(path, mtime):
+    """Parsed JSON file (orjson), kept across reruns / Compare clicks; mtime is only part of the key so an edited file is re-read"""
+    with open(path, 'rb') as f:
+        return orjson.loads(f.read())
+
+
+@st.cache_data(show_spinner=False)
+def _load_index_json(path, mtime):
+    """A folder's parsed _index.json, kept across reruns / Compare clicks; mtime is only part of the key"""
+    with open(path, 'rb') as f:
+        return orjson.loads(f.read())
+
+
 def load_s3_folder_data(data_dict, folder_key):
     """Load S3 folder scan data"""
     # data_dict is the loaded dump data
@@ -105,89 +140,107 @@ def render_s3_files_comparison(src_folder_path, tgt_folder_path):
         st.error(f"❌ Target index not found: {tgt_index_path}")
         return report
     
-    with open(src_index_path, 'r') as f:
-        src_index = json.load(f)
-    
-    with open(tgt_index_path, 'r') as f:
-        tgt_index = json.load(f)
+    src_index = _load_index_json(src_index_path, os.path.getmtime(src_index_path))
+    tgt_index = _load_index_json(tgt_index_path, os.path.getmtime(tgt_index_path))
     
     # Build file dictionaries
     src_files = {f['filename']: f for f in src_index['files']}
     tgt_files = {f['filename']: f for f in tgt_index['files']}
+    stripped_index = build_stripped_index(tgt_files)
     
     # Summary metrics
     st.subheader("📊 Comparison Summary")
-    col1, col2, col3, col4 = st.columns(4)
-    
-    matched_count = 0
-    differ_count = 0
-    missing_count = 0
-    
-    # Quick scan for counts
-    for src_file in src_files.keys():
-        if src_file in tgt_files:
-            src_hash = src_files[src_file].get('content_hash')
-            tgt_hash = tgt_files[src_file].get('content_hash')
-            if src_hash and tgt_hash:
-                if src_hash == tgt_hash:
-                    matched_count += 1
-                else:
-                    differ_count += 1
-        else:
-            # Try fuzzy match for version patterns
-            has_version = bool(src_files[src_file].get('version_detected'))
-            matched, _ = find_matching_file_fuzzy(src_file, tgt_files, has_version)
-            if not matched:
-                missing_count += 1
-    
-    col1.metric("Total Files", len(src_files))
-    col2.metric("Identical", matched_count, delta=None)
-    col3.metric("Different", differ_count, delta=None)
-    col4.metric("Missing", missing_count, delta=None)
+    col1, col2, col3, col4, col5 = st.columns(5)
     
     st.divider()
     
-    # Detailed comparison
+    # Single classification pass; the metric columns above are filled in once it's done
     identical_files = []
     different_files = []
     missing_files = []
+    renamed_files = []
+    matched_targets = set()
+    
+    # Renamed = same bytes under a target name no source has; (hash_algo, content_hash) -> those names, each handed out once
+    tgt_hash_index = {}
+    for name, meta in tgt_files.items():
+        if meta.get('content_hash') and name not in src_files:
+            tgt_hash_index.setdefault((meta.get('hash_algo', 'md5'), meta['content_hash']), []).append(name)
     
     for src_filename, src_file in src_files.items():
-        # Try to find matching file
+        # Try to find matching file; unversioned names are exact-only, so one .get() both matches and fetches
         has_version = bool(src_file.get('version_detected'))
-        tgt_filename, match_type = find_matching_file_fuzzy(src_filename, tgt_files, has_version)
+        tgt_filename, match_type = src_filename, "exact"
+        tgt_file = None if has_version else tgt_files.get(src_filename)
+        
+        if tgt_file is None and has_version:
+            # Version pattern is one dict hit, checked before the hash so re-versioned files keep their version match
+            tgt_filename, match_type = stripped_index.get(_VER_RE.sub('', src_filename)), "version_pattern"
+            tgt_file = tgt_files[tgt_filename] if tgt_filename else None
+        
+        if tgt_file is None:
+            # Content hash next: a rename found this way skips the fuzzy scoring entirely
+            src_hash = src_file.get('content_hash')
+            candidates = tgt_hash_index.get((src_file.get('hash_algo', 'md5'), src_hash)) if src_hash else None
+            while candidates and candidates[0] in matched_targets:
+                candidates.pop(0)  # already taken by a version match
+            if candidates:
+                tgt_filename = candidates.pop(0)
+                matched_targets.add(tgt_filename)
+                renamed_files.append((src_filename, tgt_filename, src_file, tgt_files[tgt_filename]))
+                continue
+            
+            if has_version:
+                tgt_filename, match_type = find_matching_file_fuzzy(src_filename, tgt_files, stripped_index, has_version)
+                tgt_file = tgt_files[tgt_filename] if tgt_filename else None
         
-        if not tgt_filename:
+        if tgt_file is None:
             # File missing in target
             missing_files.append(src_filename)
             continue
         
-        tgt_file = tgt_files[tgt_filename]
+        matched_targets.add(tgt_filename)
         
-        # Compare hashes
+        # Compare hashes (only meaningful when both sides used the same algo; older indexes are MD5)
         src_hash = src_file.get('content_hash')
         tgt_hash = tgt_file.get('content_hash')
+        same_algo = src_file.get('hash_algo', 'md5') == tgt_file.get('hash_algo', 'md5')
         
-        if src_hash and tgt_hash and src_hash == tgt_hash:
+        if src_hash and tgt_hash and same_algo and src_hash == tgt_hash:
             identical_files.append((src_filename, tgt_filename, src_file, tgt_file))
         else:
             different_files.append((src_filename, tgt_filename, src_file, tgt_file, match_type))
     
+    col1.metric("Total Files", len(src_files))
+    col2.metric("Identical", len(identical_files), delta=None)
+    col3.metric("Different", len(different_files), delta=None)
+    col4.metric("Renamed", len(renamed_files), delta=None, help="Missing under the source name, same content under another target name")
+    col5.metric("Missing", len(missing_files), delta=None)
+    
     # Render Missing Files (CRITICAL)
     if missing_files:
         st.error(f"🔴 Missing Files in Target ({len(missing_files)})")
+        # All cards in one st.markdown call (one delta message instead of one per file)
+        cards = []
+        missing_badge = BADGE_CRIT.format("CRITICAL: Required file not found")
         for filename in missing_files:
             src_file = src_files[filename]
-            st.markdown(f"""
-            <div class='resource-card' style='border-left: 5px solid #c62828;'>
-                <b>❌ {filename}</b><br>
-                <b>Status:</b> MISSING IN TARGET<br>
-                <b>Size:</b> {src_file['size']} bytes<br>
-                <b>Last Modified:</b> {src_file['last_modified']}<br>
-                <span class='badge-crit'>CRITICAL: Required file not found</span>
-            </div>
-            """, unsafe_allow_html=True)
+            cards.append(_CARD_HTML % ('#c62828', f"❌ {filename}",
+                                       f"<b>Status:</b> MISSING IN TARGET<br><b>Size:</b> {src_file['size']} bytes<br>"
+                                       f"<b>Last Modified:</b> {src_file['last_modified']}<br>{missing_badge}"))
             report["Critical"].append(f"Missing file: {filename}")
+        st.markdown("\n".join(cards), unsafe_allow_html=True)
+    
+    # Render Renamed Files (same content, different name: references to the old name will break)
+    if renamed_files:
+        st.warning(f"🔁 Renamed in Target ({len(renamed_files)})")
+        cards = []
+        for src_filename, tgt_filename, src_file, tgt_file in renamed_files:
+            cards.append(_CARD_HTML % ('#ffa000', f"🔁 {src_filename} → {tgt_filename}",
+                                       f"<b>Status:</b> NOT FOUND UNDER SOURCE NAME; same content as target file<br>"
+                                       f"<b>Size:</b> {src_file['size']} bytes | <b>Hash:</b> {src_file['content_hash'][:16]}..."))
+            report["Warnings"].append(f"Renamed file: {src_filename} -> {tgt_filename} (same content)")
+        st.markdown("\n".join(cards), unsafe_allow_html=True)
     
     # Render Different Files
     if different_files:
@@ -217,10 +270,8 @@ def render_s3_files_comparison(src_folder_path, tgt_folder_path):
                     tgt_content_path = os.path.join(tgt_folder_path, tgt_filename)
                     
                     try:
-                        with open(src_content_path, 'r') as f:
-                            src_json = json.load(f)
-                        with open(tgt_content_path, 'r') as f:
-                            tgt_json = json.load(f)
+                        src_json = _load_json_cached(src_content_path, os.path.getmtime(src_content_path))
+                        tgt_json = _load_json_cached(tgt_content_path, os.path.getmtime(tgt_content_path))
                         
                         diffs = compare_json_deep(src_json, tgt_json)
                         
@@ -254,13 +305,13 @@ def render_s3_files_comparison(src_folder_path, tgt_folder_path):
                         col_dl1, col_dl2 = st.columns(2)
                         col_dl1.download_button(
                             "📥 Download Source",
-                            data=json.dumps(src_json, indent=2),
+                            data=orjson.dumps(src_json, option=orjson.OPT_INDENT_2),
                             file_name=f"source_{src_filename}",
                             key=f"dl_src_{src_filename}"
                         )
                         col_dl2.download_button(
                             "📥 Download Target",
-                            data=json.dumps(tgt_json, indent=2),
+                            data=orjson.dumps(tgt_json, option=orjson.OPT_INDENT_2),
                             file_name=f"target_{tgt_filename}",
                             key=f"dl_tgt_{tgt_filename}"
                         )
@@ -294,12 +345,8 @@ def render_s3_files_comparison(src_folder_path, tgt_folder_path):
     # Render Identical Files (Collapsed)
     if identical_files:
         with st.expander(f"🟢 Identical Files ({len(identical_files)})"):
-            for src_filename, tgt_filename, src_file, tgt_file in identical_files:
-                st.markdown(f"""
-                <div class='resource-card'>
-                    <b>✅ {src_filename}</b><br>
-                    Size: {src_file['size']} bytes | Hash: {src_file['content_hash'][:16]}...
-                </div>
-                """, unsafe_allow_html=True)
+            st.markdown("\n".join([_IDENTICAL_CARD_HTML % (src_filename, src_file['size'], src_file['content_hash'][:16])
+                                   for src_filename, tgt_filename, src_file, tgt_file in identical_files]),
+                        unsafe_allow_html=True)
     
     return report
@@ -3,6 +3,16 @@
 # Replace your existing tab definitions with these
 # ==========================================
 
+def _build_md_report(title, rpt, title_src, title_tgt):
+    """Markdown download for a dashboard report: one section per non-empty category"""
+    lines = [f"# {title}: {title_src} vs {title_tgt}", ""]
+    for category, items in rpt.items():
+        if items:
+            lines.append(f"## {category}")
+            lines.extend([f"- {i}" for i in items])
+            lines.append("")
+    return "\n".join(lines) + "\n"
+
 # Update the tab creation line to include all tabs:
 tab1, tab2, tab3, tab4, tab5, tab6, tab7, tab8, tab9 = st.tabs([
     "📦 ECS Task Definitions", 
@@ -32,10 +42,8 @@ with tab1:
     
     if sel_src and sel_tgt:
         rpt = render_ecs_dashboard(data_a["ecs_td"][sel_src], data_b["ecs_td"][sel_tgt], ctx)
-        md = f"# ECS Report: {sel_src} vs {sel_tgt}\n\n"
-        for k, v in rpt.items():
-            if v: md += f"## {k}\n" + "\n".join([f"- {i}" for i in v]) + "\n\n"
-        st.download_button("📥 Download ECS Report", md, "ecs_report.md")
+        st.download_button("📥 Download ECS Report", data=lambda rpt=rpt, sel_src=sel_src, sel_tgt=sel_tgt: _build_md_report("ECS Report", rpt, sel_src, sel_tgt),
+                           file_name="ecs_report.md")
 
 # TAB 2: S3 Buckets (Existing - Keep as is)
 with tab2:
@@ -52,9 +60,9 @@ with tab2:
     
     if sel_src and sel_tgt:
         rpt = render_s3_dashboard(data_a["s3"][sel_src], data_b["s3"][sel_tgt])
-        md = f"# S3 Report: {sel_src} vs {sel_tgt}\n\n"
-        for i in rpt["Risks"]: md += f"- [RISK] {i}\n"
-        st.download_button("📥 Download S3 Report", md, "s3_report.md")
+        st.download_button("📥 Download S3 Report",
+                           data=lambda rpt=rpt, sel_src=sel_src, sel_tgt=sel_tgt: f"# S3 Report: {sel_src} vs {sel_tgt}\n\n" + "".join([f"- [RISK] {i}\n" for i in rpt["Risks"]]),
+                           file_name="s3_report.md")
 
 # TAB 3: API Gateway (Existing - Keep as is)
 with tab3:
@@ -72,10 +80,8 @@ with tab3:
     if sel_src and sel_tgt:
         st.subheader(f"Comparing: {sel_src} → {sel_tgt}")
         rpt = render_api_gateway_dashboard(data_a["api_gw"][sel_src], data_b["api_gw"][sel_tgt])
-        md = f"# API Gateway Report: {sel_src} vs {sel_tgt}\n\n"
-        for category, items in rpt.items():
-            if items: md += f"## {category}\n" + "\n".join([f"- {i}" for i in items]) + "\n\n"
-        st.download_button("📥 Download API Gateway Report", md, "api_gateway_report.md", key="dl_api")
+        st.download_button("📥 Download API Gateway Report", data=lambda rpt=rpt, sel_src=sel_src, sel_tgt=sel_tgt: _build_md_report("API Gateway Report", rpt, sel_src, sel_tgt),
+                           file_name="api_gateway_report.md", key="dl_api")
 
 # TAB 4: Lambda Functions (NEW)
 with tab4:
@@ -100,10 +106,8 @@ with tab4:
                 st.subheader(f"⚡ Comparing: {sel_src} → {sel_tgt}")
                 rpt = render_lambda_dashboard(data_a["lambda"][sel_src], data_b["lambda"][sel_tgt])
                 
-                md = f"# Lambda Report: {sel_src} vs {sel_tgt}\n\n"
-                for category, items in rpt.items():
-                    if items: md += f"## {category}\n" + "\n".join([f"- {i}" for i in items]) + "\n\n"
-                st.download_button("📥 Download Lambda Report", md, "lambda_report.md", key="dl_lambda")
+                st.download_button("📥 Download Lambda Report", data=lambda rpt=rpt, sel_src=sel_src, sel_tgt=sel_tgt: _build_md_report("Lambda Report", rpt, sel_src, sel_tgt),
+                                   file_name="lambda_report.md", key="dl_lambda")
 
 # TAB 5: SQS & SNS (NEW)
 with tab5:
@@ -131,10 +135,8 @@ with tab5:
                 if sel_src and sel_tgt:
                     rpt = render_sqs_dashboard(data_a["sqs"][sel_src], data_b["sqs"][sel_tgt])
                     
-                    md = f"# SQS Report: {sel_src} vs {sel_tgt}\n\n"
-                    for category, items in rpt.items():
-                        if items: md += f"## {category}\n" + "\n".join([f"- {i}" for i in items]) + "\n\n"
-                    st.download_button("📥 Download SQS Report", md, "sqs_report.md", key="dl_sqs")
+                    st.download_button("📥 Download SQS Report", data=lambda rpt=rpt, sel_src=sel_src, sel_tgt=sel_tgt: _build_md_report("SQS Report", rpt, sel_src, sel_tgt),
+                                       file_name="sqs_report.md", key="dl_sqs")
     
     # SNS Sub-tab
     with sub_tab2:
@@ -158,10 +160,8 @@ with tab5:
                 if sel_src and sel_tgt:
                     rpt = render_sns_dashboard(data_a["sns"][sel_src], data_b["sns"][sel_tgt])
                     
-                    md = f"# SNS Report: {sel_src} vs {sel_tgt}\n\n"
-                    for category, items in rpt.items():
-                        if items: md += f"## {category}\n" + "\n".join([f"- {i}" for i in items]) + "\n\n"
-                    st.download_button("📥 Download SNS Report", md, "sns_report.md", key="dl_sns")
+                    st.download_button("📥 Download SNS Report", data=lambda rpt=rpt, sel_src=sel_src, sel_tgt=sel_tgt: _build_md_report("SNS Report", rpt, sel_src, sel_tgt),
+                                       file_name="sns_report.md", key="dl_sns")
 
 # TAB 6: Load Balancers (NEW)
 with tab6:
@@ -185,10 +185,8 @@ with tab6:
             if sel_src and sel_tgt:
                 rpt = render_load_balancer_dashboard(data_a["lb"][sel_src], data_b["lb"][sel_tgt])
                 
-                md = f"# Load Balancer Report: {sel_src} vs {sel_tgt}\n\n"
-                for category, items in rpt.items():
-                    if items: md += f"## {category}\n" + "\n".join([f"- {i}" for i in items]) + "\n\n"
-                st.download_button("📥 Download LB Report", md, "lb_report.md", key="dl_lb")
+                st.download_button("📥 Download LB Report", data=lambda rpt=rpt, sel_src=sel_src, sel_tgt=sel_tgt: _build_md_report("Load Balancer Report", rpt, sel_src, sel_tgt),
+                                   file_name="lb_report.md", key="dl_lb")
 
 # TAB 7: Security Groups (NEW)
 with tab7:
@@ -212,10 +210,8 @@ with tab7:
             if sel_src and sel_tgt:
                 rpt = render_security_group_dashboard(data_a["sg"][sel_src], data_b["sg"][sel_tgt])
                 
-                md = f"# Security Group Report: {sel_src} vs {sel_tgt}\n\n"
-                for category, items in rpt.items():
-                    if items: md += f"## {category}\n" + "\n".join([f"- {i}" for i in items]) + "\n\n"
-                st.download_button("📥 Download SG Report", md, "sg_report.md", key="dl_sg")
+                st.download_button("📥 Download SG Report", data=lambda rpt=rpt, sel_src=sel_src, sel_tgt=sel_tgt: _build_md_report("Security Group Report", rpt, sel_src, sel_tgt),
+                                   file_name="sg_report.md", key="dl_sg")
 
 # TAB 8: IAM Roles (NEW)
 with tab8:
@@ -239,18 +235,21 @@ with tab8:
             if sel_src and sel_tgt:
                 rpt = render_iam_role_dashboard(data_a["iam"][sel_src], data_b["iam"][sel_tgt])
                 
-                md = f"# IAM Role Report: {sel_src} vs {sel_tgt}\n\n"
-                for category, items in rpt.items():
-                    if items: md += f"## {category}\n" + "\n".join([f"- {i}" for i in items]) + "\n\n"
-                st.download_button("📥 Download IAM Report", md, "iam_report.md", key="dl_iam")
+                st.download_button("📥 Download IAM Report", data=lambda rpt=rpt, sel_src=sel_src, sel_tgt=sel_tgt: _build_md_report("IAM Role Report", rpt, sel_src, sel_tgt),
+                                   file_name="iam_report.md", key="dl_iam")
+
+@st.cache_data(show_spinner=False)
+def _list_s3_folders(base_path, base_mtime):
+    """s3_file_contents* entries of a dump folder; base_mtime (changes when entries are added/removed) keys the cache"""
+    return [k for k in os.listdir(base_path) if k.startswith("s3_file_contents")]
 
 # TAB 9: S3 Files (NEW)
 with tab9:
     st.markdown("### 📄 S3 Configuration Files Comparison")
     
     # Find S3 file content folders
-    src_folders = [k for k in os.listdir(path_a) if k.startswith("s3_file_contents")] if os.path.exists(path_a) else []
-    tgt_folders = [k for k in os.listdir(path_b) if k.startswith("s3_file_contents")] if os.path.exists(path_b) else []
+    src_folders = _list_s3_folders(path_a, os.stat(path_a).st_mtime_ns) if os.path.exists(path_a) else []
+    tgt_folders = _list_s3_folders(path_b, os.stat(path_b).st_mtime_ns) if os.path.exists(path_b) else []
     
     if not src_folders:
         st.info("No S3 file contents found in source dump. Run collector with --s3-files-config option.")
@@ -277,7 +276,6 @@ with tab9:
             
             rpt = render_s3_files_comparison(src_folder_path, tgt_folder_path)
             
-            md = f"# S3 Files Report: {sel_src_folder} vs {sel_tgt_folder}\n\n"
-            for category, items in rpt.items():
-                if items: md += f"## {category}\n" + "\n".join([f"- {i}" for i in items]) + "\n\n"
+            # Built eagerly: this button only exists on the Compare click's run, so there's no per-rerun cost to defer
+            md = _build_md_report("S3 Files Report", rpt, sel_src_folder, sel_tgt_folder)
             st.download_button("📥 Download S3 Files Report", md, "s3_files_report.md", key="dl_s3files")